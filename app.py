@@ -1,41 +1,144 @@
-from flask import Flask, render_template, request, jsonify
+import time
+_APP_IMPORT_START = time.perf_counter()
+
+from flask import Flask, Request, render_template, request, jsonify, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
+import hashlib
+import json
 import sys
+import threading
 import traceback
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 app = Flask(__name__)
 
 # Global Error State
 GLOBAL_ERROR = None
-math_engine = None
 image_handler = None
-translator = None
+graph_cache = None
+ocr_cache = None
+command_pool = None
+batch_pool = None
+ocr_pool = None
 
-try:
-    import os
+
+# ========== LAZY CAPABILITIES ==========
+# Heavy modules load on first use, so serverless cold starts for '/' or
+# '/about' never pay for SymPy, matplotlib or OCR.
+def _load_figure_pool():
     os.environ['MPLCONFIGDIR'] = '/tmp'
+    timed_import('matplotlib', 'graphing')
+    timed_import('mpl_toolkits.mplot3d', 'graphing')
+    # Pre-styled figures reused per thread, drawn with the OO API (no pyplot)
+    return timed_import('figures', 'graphing').FigurePool()
 
-    import base64
-    import io
-    import matplotlib
-    matplotlib.use('Agg')
-    import matplotlib.pyplot as plt
-    from mpl_toolkits.mplot3d import Axes3D
-    import sympy
-    from sympy import sympify as sympy_sympify
-    import numpy as np
 
-    from calculator_logic import MathEngine, ImageHandler
+def _load_math_engine():
+    timed_import('sympy', 'math')
+    from calculator_logic import MathEngine
+    from rate_limit import MemoryRateLimiter, SQLiteRateLimiter
 
-    math_engine = MathEngine()
-    image_handler = ImageHandler()
+    # Heavy SymPy work runs in a pre-warmed process pool with per-action deadlines
+    # (CALC_WORKERS=0 runs everything inline, e.g. on serverless)
+    workers = int(os.environ.get('CALC_WORKERS', 2))
+    timeouts = {action: float(os.environ.get(f'CALC_TIMEOUT_{action}', seconds))
+                for action, seconds in DEFAULT_TIMEOUTS.items()}
+    # When warming up before a fork, each forked server worker starts its own pool
+    executor = (SymbolicExecutor(workers=workers, timeouts=timeouts, start=not os.environ.get('CALC_WARMUP'))
+                if workers > 0 else None)
+
+    # Per-client rate limiting; a SQLite file shares the counters across worker processes
+    rate_args = dict(max_requests=int(os.environ.get('CALC_RATE_LIMIT_REQUESTS', 30)),
+                     window_seconds=float(os.environ.get('CALC_RATE_LIMIT_WINDOW', 60)))
+    rate_limit_db = os.environ.get('CALC_RATE_LIMIT_DB')
+    rate_limiter = SQLiteRateLimiter(rate_limit_db, **rate_args) if rate_limit_db else MemoryRateLimiter(**rate_args)
+
+    # Optional on-disk result cache so solved problems survive worker restarts
+    result_cache_ttl = os.environ.get('CALC_RESULT_CACHE_TTL')
+    return MathEngine(result_cache_path=os.environ.get('CALC_RESULT_CACHE'),
+                      result_cache_ttl=float(result_cache_ttl) if result_cache_ttl else None,
+                      result_cache_rows=int(os.environ.get('CALC_RESULT_CACHE_ROWS', 100000)),
+                      executor=executor, rate_limiter=rate_limiter)
+
+
+def _load_image_handler():
+    from calculator_logic import ImageHandler
+    from ocr import OCREngine
+
+    # Long-lived Tesseract workers; images or regions beyond this many at once queue up
+    return ImageHandler(OCREngine(workers=OCR_WORKERS))
+
+
+def _load_translator():
+    from translation import GoogleBackend, PhraseTable, Translator
+
+    # Common phrasing is translated offline; the rest goes to Google (if
+    # deep_translator is installed) and is remembered, across restarts with
+    # CALC_TRANSLATION_CACHE
+    return Translator([PhraseTable(), GoogleBackend()],
+                      cache_size=int(os.environ.get('CALC_TRANSLATION_CACHE_SIZE', 512)),
+                      cache_path=os.environ.get('CALC_TRANSLATION_CACHE'))
+
+
+def _load_lambdify():
+    from calculator_logic import cached_lambdify
+    return cached_lambdify
 
-    # Optional translator
-    try:
-        from deep_translator import GoogleTranslator
-        translator = GoogleTranslator
-    except ImportError:
-        translator = None
+
+try:
+    import os
+    import base64
+    import io
+
+    from lazy import LazyObject, lazy_module, timed_import, import_report
+    from caching import ByteLRUCache, SimilarityCache
+    from ocr import hash_distance, perceptual_hash
+    from executor import SymbolicExecutor, ComputationTimeout, DEFAULT_TIMEOUTS
+
+    sympy = lazy_module('sympy', 'math')
+    np = lazy_module('numpy', 'graphing')
+    figure_pool = LazyObject('graphing', _load_figure_pool)
+    math_engine = LazyObject('math', _load_math_engine)
+    cached_lambdify = LazyObject('lambdify', _load_lambdify, timed=False)
+    image_handler = LazyObject('ocr', _load_image_handler)
+    translator = LazyObject('translation', _load_translator)
+    CAPABILITIES = (math_engine, figure_pool, image_handler, translator)
+
+    # Finished PNGs, content-addressed by plot parameters (memory budget in bytes)
+    graph_cache = ByteLRUCache(max_bytes=int(os.environ.get('CALC_GRAPH_CACHE_BYTES', 32 * 1024 * 1024)))
+
+    # OCR text and result per uploaded image: by exact content hash, or by a
+    # perceptual hash within CALC_OCR_CACHE_DISTANCE for re-photographed copies
+    ocr_cache = SimilarityCache(maxsize=int(os.environ.get('CALC_OCR_CACHE_SIZE', 256)),
+                                max_distance=float(os.environ.get('CALC_OCR_CACHE_DISTANCE', 0.5)),
+                                distance=hash_distance)
+
+    # Behind a proxy (e.g. Vercel) the client address is in X-Forwarded-For.
+    # Only the entries added by our own proxies are trusted; anything to
+    # their left was sent by the client and could be anything
+    trust_proxy = os.environ.get('CALC_TRUST_PROXY', '')
+    proxy_hops = int(trust_proxy) if trust_proxy.isdigit() else int(bool(trust_proxy))
+    if proxy_hops:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops)
+
+    # Clients with one of these keys get their own rate-limit bucket instead of their IP's
+    API_KEYS = frozenset(key.strip() for key in os.environ.get('CALC_API_KEYS', '').split(',') if key.strip())
+
+    # Chained "then"/"also" sub-commands run concurrently on these threads
+    command_pool = ThreadPoolExecutor(max_workers=int(os.environ.get('CALC_COMMAND_THREADS', 4)),
+                                      thread_name_prefix='command')
+
+    # /batch commands run on their own threads so a large batch can't starve
+    # interactive requests; at most CALC_BATCH_QUEUE of them may be waiting
+    batch_pool = ThreadPoolExecutor(max_workers=int(os.environ.get('CALC_BATCH_THREADS', 2)),
+                                    thread_name_prefix='batch')
+    batch_slots = threading.BoundedSemaphore(int(os.environ.get('CALC_BATCH_QUEUE', 200)))
+
+    # Regions of an uploaded worksheet are read and evaluated concurrently
+    OCR_WORKERS = int(os.environ.get('CALC_OCR_WORKERS', os.cpu_count() or 1))
+    ocr_pool = ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix='ocr')
 
     if not os.path.exists('static'):
         os.makedirs('static')
@@ -43,8 +146,21 @@ try:
 except Exception as e:
     GLOBAL_ERROR = f"Server Startup Error:\n{str(e)}\n\n{traceback.format_exc()}"
 
+APP_IMPORT_SECONDS = time.perf_counter() - _APP_IMPORT_START
+
+
+def startup_error():
+    """Load the math engine on first use; returns the startup error text, if any."""
+    global GLOBAL_ERROR
+    if GLOBAL_ERROR is None:
+        try:
+            math_engine.lazy_load()
+        except Exception as e:
+            GLOBAL_ERROR = f"Server Startup Error:\n{str(e)}\n\n{traceback.format_exc()}"
+    return GLOBAL_ERROR
 
-def process_single_command(text):
+
+def process_single_command(text, graph_format='base64'):
     """Process a single command using intent parsing and return a response dict."""
     response = {
         'speech': '',
@@ -69,7 +185,7 @@ def process_single_command(text):
 
         # 3. Handle Actions
         if action == "PLOT_2D" or action == "PLOT_3D":
-             return handle_graphing(intent, action == "PLOT_3D", response)
+             return handle_graphing(intent, action == "PLOT_3D", response, graph_format)
         
         elif action == "SOLVE":
             result = math_engine.check_equation(text)
@@ -106,6 +222,9 @@ def process_single_command(text):
             response['speech'] = "I didn't understand that math. Could you rephrase?"
             response['result'] = None
 
+    except ComputationTimeout as e:
+        response['speech'] = "That is taking too long to compute, so I stopped."
+        response['result'] = f"Error: Computation timed out after {e.timeout:g} seconds"
     except sympy.SympifyError:
         response['speech'] = "I caught the equation, but the format is a bit tricky."
         response['result'] = f"Parsing Error: Could not understand '{text}'"
@@ -119,7 +238,88 @@ def process_single_command(text):
     return response
 
 
-def handle_graphing(intent, is_3d, response):
+GRAPH_DPI = 100
+
+
+def graph_cache_key(f, pretty_func, is_3d, levels, x_bound, y_bound, dpi=GRAPH_DPI):
+    """Content address of a rendered graph: hash of everything that affects the PNG.
+
+    dpi=None addresses the geometry payload of the 'data' graph format instead.
+    """
+    key = (sympy.srepr(f), pretty_func, bool(is_3d), tuple(levels), float(x_bound), float(y_bound), dpi)
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+def pack_array(values, dtype='<f4'):
+    """Base64 of an array's raw little-endian bytes (float32 by default)."""
+    return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode()
+
+
+def plot_geometry(f, pretty_func, is_3d, is_implicit, levels, intercepts, x_bound, y_bound):
+    """Sampled geometry of a graph for client-side drawing (the 'data' graph format).
+
+    2D plots are polylines of interleaved float32 x, y pairs. 3D surfaces are
+    either a float32 grid of z values (z = f(x, y)) or a triangle mesh of
+    float32 vertices and uint16/uint32 faces (implicit surfaces).
+    """
+    from sampling import adaptive_sample, trace_implicit
+
+    x_sym, y_sym = sympy.symbols('x y')
+    bounds = [-x_bound, x_bound, -y_bound, y_bound]
+    plot = {'kind': '3d' if is_3d else '2d', 'title': '', 'bounds': bounds}
+
+    if is_3d:
+        if is_implicit:
+            vertices, triangles = math_engine.run_job('PLOT_3D', 'implicit_surface', f, x_bound, y_bound, 2000)
+            index_type = '<u2' if len(vertices) < 65536 else '<u4'
+            plot['surfaces'] = [{'vertices': pack_array(vertices), 'faces': pack_array(triangles, index_type),
+                                 'index_type': 'uint16' if index_type == '<u2' else 'uint32'}]
+            plot['title'] = f"3D Graph of {pretty_func}"
+        else:
+            f_lambdified = cached_lambdify((x_sym, y_sym), f, modules=['numpy'])
+            X, Y = np.meshgrid(np.linspace(-x_bound, x_bound, 80), np.linspace(-y_bound, y_bound, 80))
+            Z = np.broadcast_to(np.asarray(f_lambdified(X, Y), dtype=float), X.shape)
+            offsets = levels if levels and len(levels) > 1 else [0]
+            plot['surfaces'] = [{'grid': pack_array(Z + level), 'shape': list(Z.shape),
+                                 'level': level if len(offsets) > 1 else None} for level in offsets]
+            plot['title'] = (f"z = {pretty_func}\nLevels: {', '.join(map(str, levels))}"
+                             if len(offsets) > 1 else f"z = {pretty_func}")
+        bounds += [-x_bound, x_bound]
+        return plot
+
+    lines = []
+    if is_implicit:
+        f_lambdified = cached_lambdify((x_sym, y_sym), f, modules=['numpy'])
+        if levels and len(levels) > 1:
+            for level in levels:
+                traced, _ = trace_implicit(lambda X, Y, level=level: f_lambdified(X, Y) - level,
+                                           (-x_bound, x_bound), (-y_bound, y_bound))
+                lines += [{'points': pack_array(line), 'level': level} for line in traced]
+            plot['title'] = f"Contours of: {pretty_func}"
+        else:
+            traced, _ = trace_implicit(f_lambdified, (-x_bound, x_bound), (-y_bound, y_bound))
+            lines = [{'points': pack_array(line)} for line in traced]
+            plot['points'] = [[float(ix), float(iy)] for ix, iy in intercepts]
+            plot['title'] = f"Graph of {pretty_func}"
+    else:
+        f_lambdified = cached_lambdify(x_sym, f, modules=['numpy'])
+        x_vals, y_vals, y_lim = adaptive_sample(f_lambdified, -x_bound, x_bound)
+        # One polyline per unbroken stretch of the curve
+        finite = np.isfinite(y_vals)
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], finite.astype(int), [0]])))
+        for start, stop in zip(edges[::2], edges[1::2]):
+            if stop - start > 1:
+                lines.append({'points': pack_array(np.column_stack([x_vals[start:stop], y_vals[start:stop]]))})
+        if y_lim is None and finite.any():
+            y_lim = (float(y_vals[finite].min()), float(y_vals[finite].max()))
+        if y_lim:
+            bounds[2:] = [min(y_lim[0], 0.0), max(y_lim[1], 0.0)]
+        plot['title'] = f"Graph of y = {pretty_func}"
+    plot['lines'] = lines
+    return plot
+
+
+def handle_graphing(intent, is_3d, response, graph_format='base64'):
     import warnings
     # Ignore complex/nan numpy warnings for partial 3D surfaces (like spheres)
     warnings.filterwarnings('ignore') 
@@ -138,10 +338,11 @@ def handle_graphing(intent, is_3d, response):
              is_implicit = True
 
         f = sympy.sympify(func_str, locals=local_dict)
+        # Any z in a 3D plot means a surface F(x, y, z) = 0, not z = f(x, y)
+        if is_3d and z_sym in f.free_symbols:
+            is_implicit = True
         pretty_func = math_engine.pretty_func_name(func_str)
-        
-        plt.close('all')
-        
+
         # --- DYNAMIC BOUNDS CALCULATION ---
         intercepts = math_engine.get_intercepts(func_str)
         if intercepts:
@@ -151,148 +352,206 @@ def handle_graphing(intent, is_3d, response):
             x_bound, y_bound = limit, limit
         else:
             x_bound, y_bound = 12, 12
-            
-        if is_3d:
-            fig = plt.figure(figsize=(7, 5))
-            ax = fig.add_subplot(111, projection='3d')
-            
-            x_vals = np.linspace(-x_bound, x_bound, 80)
-            y_vals = np.linspace(-y_bound, y_bound, 80)
-            X, Y = np.meshgrid(x_vals, y_vals)
-            
-            if is_implicit:
-                if z_sym not in f.free_symbols:
-                    # TRUE CYLINDER: Extruded 2D shape (like x^2 + y^2 = 4)
-                    f_lambdified = sympy.lambdify((x_sym, y_sym), f, modules=['numpy'])
-                    Z_eval = f_lambdified(X, Y)
-                    if np.isscalar(Z_eval): Z_eval = np.full(X.shape, Z_eval)
-                    
-                    # Stack contours along Z axis to form a 3D wireframe cylinder
-                    try:
-                        for z_val in np.linspace(-x_bound, x_bound, 40):
-                            ax.contour(X, Y, Z_eval, levels=[0], zdir='z', offset=z_val, colors='#4f46e5', alpha=0.5)
-                        ax.set_zlim(-x_bound, x_bound)
-                    except Exception:
-                        pass
-                else:
-                    # TRUE 3D IMPLICIT (like x^2 + y^2 + z^2 = 9)
-                    z_sols = sympy.solve(f, z_sym)
-                    if z_sols:
-                        for sol in z_sols:
-                            sol_lam = sympy.lambdify((x_sym, y_sym), sol, modules=['numpy'])
-                            Z = sol_lam(X, Y)
-                            if np.isscalar(Z): Z = np.full(X.shape, Z)
-                            
-                            # Hide invalid/imaginary values (prevents crashes on spheres)
-                            if np.iscomplexobj(Z) or Z.dtype == object:
-                                Z = np.array(Z, dtype=complex)
-                                Z[np.iscomplex(Z)] = np.nan
-                                Z = np.real(Z)
-                                
-                            ax.plot_surface(X, Y, Z, cmap='plasma', alpha=0.7)
-                    else:
-                        response['speech'] = "I couldn't solve this 3D equation."
-                        response['result'] = "3D Plot Error"
-                        return response
+
+        graph_type = "3D graph" if is_3d else "Graph"
+        if graph_format == 'data':
+            # Sampled geometry for the client to draw; no matplotlib at all
+            data_id = graph_cache_key(f, pretty_func, is_3d, levels, x_bound, y_bound, dpi=None)
+            payload = graph_cache.get(data_id)
+            if payload is None:
+                payload = json.dumps(plot_geometry(f, pretty_func, is_3d, is_implicit, levels,
+                                                   intercepts, x_bound, y_bound)).encode()
+                graph_cache.put(data_id, payload)
+            response['plot'] = json.loads(payload)
+            response['speech'] = f"Plotting {pretty_func}"
+            response['result'] = f"{graph_type} of {pretty_func}"
+            return response
+
+        graph_id = graph_cache_key(f, pretty_func, is_3d, levels, x_bound, y_bound)
+        png = graph_cache.get(graph_id)
+        if png is not None:
+            response['graph'] = base64.b64encode(png).decode()
+            response['graph_id'] = graph_id
+            response['speech'] = f"Plotting {pretty_func}"
+            response['result'] = f"{graph_type} of {pretty_func}"
+            return response
+
+        fig, ax = figure_pool.acquire(is_3d)
+        try:
+            if not render_graph(fig, ax, f, pretty_func, is_3d, is_implicit, levels, intercepts,
+                                x_bound, y_bound, response):
+                return response
+            img = io.BytesIO()
+            fig.savefig(img, format='png', bbox_inches='tight', dpi=GRAPH_DPI)
+        finally:
+            figure_pool.release(ax)
+        png = img.getvalue()
+        plot_url = base64.b64encode(png).decode()
+        graph_cache.put(graph_id, png)
+
+        response['graph'] = plot_url
+        response['graph_id'] = graph_id
+        response['speech'] = f"Plotting {pretty_func}"
+        response['result'] = f"{graph_type} of {pretty_func}"
+    except ComputationTimeout as e:
+        response['speech'] = "That graph is taking too long to compute, so I stopped."
+        response['result'] = f"Graph Error: Timed out after {e.timeout:g} seconds"
+    except Exception as e:
+        response['speech'] = "I could not plot that function."
+        response['result'] = f"Graph Error: {str(e)}"
+
+    return response
+
+
+def render_graph(fig, ax, f, pretty_func, is_3d, is_implicit, levels, intercepts, x_bound, y_bound, response):
+    """Draw a graph on a pooled (fig, ax); returns False after filling in response if it can't."""
+    x_sym, y_sym = sympy.symbols('x y')
+    if is_3d:
+        x_vals = np.linspace(-x_bound, x_bound, 80)
+        y_vals = np.linspace(-y_bound, y_bound, 80)
+        X, Y = np.meshgrid(x_vals, y_vals)
+        
+        if is_implicit:
+            # Cylinders (no z, like x^2 + y^2 = 4) and true 3D implicit
+            # surfaces (like x^2 + y^2 + z^2 = 9) alike: one mesh from
+            # marching tetrahedra, no symbolic solving for z; in a worker under
+            # the PLOT_3D deadline
+            vertices, triangles = math_engine.run_job('PLOT_3D', 'implicit_surface', f, x_bound, y_bound)
+            if len(triangles):
+                ax.plot_trisurf(vertices[:, 0], vertices[:, 1], triangles, vertices[:, 2],
+                                cmap='plasma', linewidth=0, antialiased=False, alpha=0.85)
             else:
-                # Standard explicit 3D surface (z = f(x,y))
-                if levels and len(levels) > 1:
-                    f_lambdified = sympy.lambdify((x_sym, y_sym), f, modules=['numpy'])
-                    colors = plt.cm.viridis(np.linspace(0, 1, len(levels)))
-                    for idx, level in enumerate(levels):
-                        try:
-                            Z = f_lambdified(X, Y) + level
-                            if np.isscalar(Z): Z = np.full(X.shape, Z)
-                            ax.plot_surface(X, Y, Z, color=colors[idx], alpha=0.5, label=f"Level {level}")
-                        except Exception: continue
-                else:
-                    f_lambdified = sympy.lambdify((x_sym, y_sym), f, modules=['numpy'])
+                response['speech'] = "I couldn't find that 3D surface in view."
+                response['result'] = "3D Plot Error"
+                return False
+        else:
+            # Standard explicit 3D surface (z = f(x,y))
+            if levels and len(levels) > 1:
+                f_lambdified = cached_lambdify((x_sym, y_sym), f, modules=['numpy'])
+                from matplotlib import colormaps
+                colors = colormaps['viridis'](np.linspace(0, 1, len(levels)))
+                for idx, level in enumerate(levels):
                     try:
-                        Z = f_lambdified(X, Y)
+                        Z = f_lambdified(X, Y) + level
                         if np.isscalar(Z): Z = np.full(X.shape, Z)
-                        ax.plot_surface(X, Y, Z, cmap='viridis', alpha=0.85)
-                    except Exception:
-                        response['speech'] = "I couldn't generate a 3D surface for that."
-                        response['result'] = "3D Plot Error"
-                        return response
-
-            # Clean Titles
-            title_str = f"z = {pretty_func}\nLevels: {', '.join(map(str, levels))}" if levels and len(levels) > 1 else f"z = {pretty_func}"
-            if is_implicit and not levels:
-                title_str = f"3D Graph of {pretty_func}"
-            
-            ax.set_title(title_str, fontsize=15, fontweight='bold', pad=20)
-            ax.set_xlabel('x-axis', fontsize=11, fontweight='600', labelpad=8)
-            ax.set_ylabel('y-axis', fontsize=11, fontweight='600', labelpad=8)
-            ax.set_zlabel('z-axis', fontsize=11, fontweight='600', labelpad=8)
-            ax.tick_params(axis='both', which='major', labelsize=9, pad=3)
+                        ax.plot_surface(X, Y, Z, color=colors[idx], alpha=0.5, label=f"Level {level}")
+                    except Exception: continue
+            else:
+                f_lambdified = cached_lambdify((x_sym, y_sym), f, modules=['numpy'])
+                try:
+                    Z = f_lambdified(X, Y)
+                    if np.isscalar(Z): Z = np.full(X.shape, Z)
+                    ax.plot_surface(X, Y, Z, cmap='viridis', alpha=0.85)
+                except Exception:
+                    response['speech'] = "I couldn't generate a 3D surface for that."
+                    response['result'] = "3D Plot Error"
+                    return False
+
+        # Clean Titles
+        title_str = f"z = {pretty_func}\nLevels: {', '.join(map(str, levels))}" if levels and len(levels) > 1 else f"z = {pretty_func}"
+        if is_implicit and not levels:
+            title_str = f"3D Graph of {pretty_func}"
+        
+        ax.set_title(title_str, fontsize=15, fontweight='bold', pad=20)
 
-        else:
-            fig = plt.figure(figsize=(7, 5))
-            ax = fig.add_subplot(111)
-            
-            ax.spines['left'].set_position('zero')
-            ax.spines['bottom'].set_position('zero')
-            ax.spines['right'].set_color('none')
-            ax.spines['top'].set_color('none')
-            ax.xaxis.set_ticks_position('bottom')
-            ax.yaxis.set_ticks_position('left')
-            ax.tick_params(axis='both', which='major', labelsize=9)
+    else:
+        if is_implicit:
+            f_lambdified = cached_lambdify((x_sym, y_sym), f, modules=['numpy'])
             
-            if is_implicit:
+            if levels and len(levels) > 1:
                 x_vals = np.linspace(-x_bound, x_bound, 400)
                 y_vals = np.linspace(-y_bound, y_bound, 400)
                 X, Y = np.meshgrid(x_vals, y_vals)
-                f_lambdified = sympy.lambdify((x_sym, y_sym), f, modules=['numpy'])
                 Z = f_lambdified(X, Y)
                 if np.isscalar(Z): Z = np.full(X.shape, Z)
-                
-                if levels and len(levels) > 1:
-                    cs = plt.contour(X, Y, Z, levels=levels, cmap='plasma', linewidths=2)
-                    plt.clabel(cs, inline=True, fontsize=10)
-                    plt.title(f"Contours of: {pretty_func}", fontsize=15, fontweight='bold', pad=25)
-                else:
-                    # Plots Parabola (y^2 = 4x) or Circle (x^2+y^2=25)
-                    plt.contour(X, Y, Z, [0], colors=['#3b82f6'], linewidths=2.5)
-                    plt.title(f"Graph of {pretty_func}", fontsize=15, fontweight='bold', pad=25)
-                    
-                    for ix, iy in intercepts:
-                        plt.plot(ix, iy, 'ro', markersize=6, zorder=5)
-                        plt.annotate(f'({ix:g}, {iy:g})', (ix, iy), 
-                                     textcoords="offset points", xytext=(10,10), 
-                                     ha='left', fontsize=9, fontweight='600',
-                                     bbox=dict(boxstyle='round,pad=0.3', fc='white', alpha=0.8, ec='gray'))
+                cs = ax.contour(X, Y, Z, levels=levels, cmap='plasma', linewidths=2)
+                ax.clabel(cs, inline=True, fontsize=10)
+                ax.set_title(f"Contours of: {pretty_func}", fontsize=15, fontweight='bold', pad=25)
             else:
-                f_lambdified = sympy.lambdify(x_sym, f, modules=['numpy'])
-                x_vals = np.linspace(-x_bound, x_bound, 400)
-                y_vals = f_lambdified(x_vals)
-                if np.isscalar(y_vals): y_vals = np.full(x_vals.shape, y_vals)
-                plt.plot(x_vals, y_vals, color='#3b82f6', linewidth=2.5, label=f"y = {pretty_func}")
-                plt.title(f"Graph of y = {pretty_func}", fontsize=15, fontweight='bold', pad=25)
-
-            plt.xlabel('x', loc='right', fontsize=11, fontweight='bold')
-            plt.ylabel('y', loc='top', fontsize=11, fontweight='bold', rotation=0)
-            plt.grid(True, linestyle='--', alpha=0.5, color='#cbd5e1')
-            plt.tight_layout()
-
-        img = io.BytesIO()
-        plt.savefig(img, format='png', bbox_inches='tight', dpi=100)
-        img.seek(0)
-        plot_url = base64.b64encode(img.getvalue()).decode()
-        plt.close('all')
-
-        graph_type = "3D graph" if is_3d else "Graph"
-        response['graph'] = plot_url
-        response['speech'] = f"Plotting {pretty_func}"
-        response['result'] = f"{graph_type} of {pretty_func}"
-    except Exception as e:
-        plt.close('all')
-        response['speech'] = "I could not plot that function."
-        response['result'] = f"Graph Error: {str(e)}"
-    
+                # Plots Parabola (y^2 = 4x) or Circle (x^2+y^2=25), traced
+                # along the curve instead of contouring a full grid
+                from sampling import trace_implicit
+                polylines, _ = trace_implicit(f_lambdified, (-x_bound, x_bound), (-y_bound, y_bound))
+                for line in polylines:
+                    ax.plot(line[:, 0], line[:, 1], color='#3b82f6', linewidth=2.5)
+                ax.set_xlim(-x_bound, x_bound)
+                ax.set_ylim(-y_bound, y_bound)
+                ax.set_title(f"Graph of {pretty_func}", fontsize=15, fontweight='bold', pad=25)
+                
+                for ix, iy in intercepts:
+                    ax.plot(ix, iy, 'ro', markersize=6, zorder=5)
+                    ax.annotate(f'({ix:g}, {iy:g})', (ix, iy), 
+                                textcoords="offset points", xytext=(10,10), 
+                                ha='left', fontsize=9, fontweight='600',
+                                bbox=dict(boxstyle='round,pad=0.3', fc='white', alpha=0.8, ec='gray'))
+        else:
+            f_lambdified = cached_lambdify(x_sym, f, modules=['numpy'])
+            # Dense only where the curve bends, broken at poles
+            from sampling import adaptive_sample
+            x_vals, y_vals, y_lim = adaptive_sample(f_lambdified, -x_bound, x_bound)
+            ax.plot(x_vals, y_vals, color='#3b82f6', linewidth=2.5, label=f"y = {pretty_func}")
+            if y_lim:
+                # Keep the axes (which cross at zero) in view
+                ax.set_ylim(min(y_lim[0], 0), max(y_lim[1], 0))
+            ax.set_title(f"Graph of y = {pretty_func}", fontsize=15, fontweight='bold', pad=25)
+
+        fig.tight_layout()
+    return True
+
+
+def client_id():
+    """Rate-limit key: the caller's API key if it is one of CALC_API_KEYS, otherwise its IP address."""
+    # Unknown keys are ignored, or a client could get a fresh bucket per request
+    api_key = request.headers.get('X-API-Key')
+    if api_key and api_key in API_KEYS:
+        return f"key:{api_key}"
+    # Behind CALC_TRUST_PROXY proxies, ProxyFix has already set this from the
+    # X-Forwarded-For entry the nearest trusted proxy added
+    return f"ip:{request.remote_addr}"
+
+
+def apply_graph_format(response, graph_format):
+    """Swap the inline base64 graph for a cacheable URL when the client asks for it."""
+    if graph_format == 'url' and response.get('graph_id'):
+        response['graph_url'] = f"/graph/{response['graph_id']}.png"
+        response['graph'] = None
     return response
 
 
+def command_events(sub_commands, graph_format):
+    """NDJSON events for a streamed /process_command.
+
+    Every sub-command's parsed intent is sent first, then each result as soon
+    as it completes, then the graphs (the slowest and largest part), then a
+    final 'done' event.
+    """
+    futures = {command_pool.submit(process_single_command, cmd, graph_format): i
+               for i, cmd in enumerate(sub_commands)}
+
+    for i, cmd in enumerate(sub_commands):
+        try:
+            intent = dict(math_engine.parse_intent(cmd))
+        except Exception:
+            intent = None
+        yield json.dumps({'event': 'intent', 'index': i, 'command': cmd, 'intent': intent}) + '\n'
+
+    graphs = []
+    for future in as_completed(futures):
+        i = futures[future]
+        try:
+            response = apply_graph_format(future.result(), graph_format)
+        except Exception as e:
+            response = {'speech': "Something went wrong while calculating.", 'result': f"Error: {str(e)}"}
+        graph = {key: response.pop(key, None) for key in ('graph', 'graph_id', 'graph_url', 'plot')}
+        yield json.dumps({'event': 'result', 'index': i, **response}) + '\n'
+        if any(graph.values()):
+            graphs.append((i, response.get('action'), graph))
+
+    for i, action, graph in sorted(graphs, key=lambda item: item[0]):
+        yield json.dumps({'event': 'graph', 'index': i, 'action': action, **graph}) + '\n'
+    yield json.dumps({'event': 'done', 'count': len(sub_commands)}) + '\n'
+
+
 @app.route('/')
 def index():
     if GLOBAL_ERROR:
@@ -316,90 +575,388 @@ def parse_intent_endpoint():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/stats')
+def stats():
+    if startup_error():
+        return jsonify({'error': 'Server Error. Check homepage.'}), 500
+    stats = math_engine.cache_stats()
+    stats['graph'] = graph_cache.stats()
+    if figure_pool.lazy_loaded:
+        stats['figures'] = figure_pool.stats()
+    if image_handler.lazy_loaded:
+        stats['ocr'] = image_handler.engine.stats()
+    stats['ocr_cache'] = ocr_cache.stats()
+    if translator.lazy_loaded:
+        stats['translation'] = translator.stats()
+    if math_engine.executor is not None:
+        stats['executor'] = math_engine.executor.stats()
+    return jsonify(stats)
+
+@app.route('/startup')
+def startup_report():
+    """Cold-start report: app import time, each lazy import and which capabilities are loaded."""
+    if GLOBAL_ERROR:
+        return jsonify({'error': 'Server Error. Check homepage.'}), 500
+    report = import_report(CAPABILITIES)
+    report['app_import_seconds'] = round(APP_IMPORT_SECONDS, 4)
+    report['warmup'] = WARMUP_REPORT
+    return jsonify(report)
+
+@app.route('/graph/<graph_id>.png')
+def cached_graph(graph_id):
+    """Serve a previously rendered graph by its content hash, with ETag revalidation."""
+    # Content-addressed: a matching ETag is always still valid, even after eviction
+    if graph_id in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        png = graph_cache.get(graph_id) if graph_cache is not None else None
+        if png is None:
+            return jsonify({'error': 'Graph not found'}), 404
+        response = app.response_class(png, mimetype='image/png')
+    response.set_etag(graph_id)
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    response.cache_control.immutable = True
+    return response
+
 @app.route('/process_command', methods=['POST'])
 def process_command():
-    if GLOBAL_ERROR:
+    if startup_error():
         return jsonify({'result': "Server Error. Check homepage.", 'speech': "Server error."})
 
-    if not math_engine.check_rate_limit():
+    if not math_engine.check_rate_limit(client_id()):
         return jsonify({'result': "Rate limit exceeded. Please slow down.", 'speech': "Too many requests."})
 
     try:
         data = request.get_json()
         text = data.get('text', '').strip()
         lang = data.get('lang', 'en-US')
+        # 'url' returns graphs as /graph/<id>.png links instead of inline base64;
+        # 'data' returns sampled geometry for the client to draw
+        graph_format = data.get('graph_format', 'base64')
+        # stream=true answers with NDJSON events as each part finishes
+        stream = bool(data.get('stream'))
 
         if not text:
             return jsonify({'result': 'No command received'})
 
         # Translate if not English
-        if translator and not lang.startswith('en'):
-            try:
-                text = translator(source='auto', target='en').translate(text)
-            except Exception:
-                pass  # Fall through with original text
+        if not lang.startswith('en'):
+            text = translator.translate(text, lang)  # Original text if untranslatable
 
         # Split into multiple commands by "then" / "also"
         sub_commands = re.split(r'\b(?:then|also)\b', text, flags=re.IGNORECASE)
         sub_commands = [cmd.strip() for cmd in sub_commands if cmd.strip()]
 
+        if stream:
+            return app.response_class(stream_with_context(command_events(sub_commands or [text], graph_format)),
+                                      mimetype='application/x-ndjson')
+
         if len(sub_commands) <= 1:
             # Single command — return directly
-            response = process_single_command(text)
-            return jsonify(response)
+            response = process_single_command(text, graph_format)
+            return jsonify(apply_graph_format(response, graph_format))
 
         # Multiple commands — combine results
         all_results = []
         all_speech = []
         last_graph = None
+        last_graph_id = None
+        last_plot = None
         last_action = None
 
-        for cmd in sub_commands:
-            resp = process_single_command(cmd)
+        # Sub-commands are independent: run them concurrently, combine in order
+        for resp in command_pool.map(process_single_command, sub_commands, [graph_format] * len(sub_commands)):
             if resp.get('result'):
                 all_results.append(resp['result'])
             if resp.get('speech'):
                 all_speech.append(resp['speech'])
             if resp.get('graph'):
                 last_graph = resp['graph']
+                last_graph_id = resp.get('graph_id')
+            if resp.get('plot'):
+                last_plot = resp['plot']
             if resp.get('action'):
                 last_action = resp['action']
 
-        return jsonify({
+        return jsonify(apply_graph_format({
             'result': ' ➜ '.join(all_results),
             'speech': '. '.join(all_speech),
             'graph': last_graph,
+            'graph_id': last_graph_id,
+            'plot': last_plot,
             'action': last_action
-        })
+        }, graph_format))
 
     except Exception as e:
         traceback.print_exc()
         return jsonify({'result': f"Server Error: {str(e)}", 'speech': "An internal error occurred."}), 500
 
+BATCH_MAX_COMMANDS = 1000
+
+
+def reserve_batch_slots(count):
+    """Take count places in the batch queue, all or none."""
+    taken = 0
+    while taken < count and batch_slots.acquire(blocking=False):
+        taken += 1
+    if taken < count:
+        for _ in range(taken):
+            batch_slots.release()
+        return False
+    return True
+
+
+def submit_batch_command(text, graph_format):
+    future = batch_pool.submit(process_single_command, text, graph_format)
+    future.add_done_callback(lambda _: batch_slots.release())
+    return future
+
+
+def is_plain_arithmetic(text):
+    """True if process_single_command would answer text with math_engine.evaluate()."""
+    return (math_engine.parse_intent(text)['action'] == 'CALCULATE'
+            and not math_engine.check_antigravity(text)
+            and not math_engine.check_unit_conversion(text)
+            and not math_engine.check_matrix(text))
+
+
+def evaluation_response(result):
+    """The response process_single_command builds around an evaluate() result."""
+    if result:
+        return {'speech': f"The answer is {result}", 'result': result, 'graph': None, 'action': 'CALCULATE'}
+    return {'speech': "I didn't understand that math. Could you rephrase?", 'result': None,
+            'graph': None, 'action': 'CALCULATE'}
+
+
+@app.route('/batch', methods=['POST'])
+def batch():
+    """Run a list of commands; streams one NDJSON line per command, in order.
+
+    Plain arithmetic goes through MathEngine.evaluate_batch, which evaluates
+    same-shaped expressions as one NumPy array and costs one request of the
+    rate limit; everything else costs one request per command and runs on
+    the batch pool.
+    """
+    if startup_error():
+        return jsonify({'error': "Server Error. Check homepage."}), 500
+
+    data = request.get_json(silent=True) or {}
+    commands = data.get('commands')
+    if not isinstance(commands, list) or not all(isinstance(cmd, str) for cmd in commands):
+        return jsonify({'error': "Expected {'commands': [text, ...]}"}), 400
+    if len(commands) > BATCH_MAX_COMMANDS:
+        return jsonify({'error': f"At most {BATCH_MAX_COMMANDS} commands per batch"}), 400
+    graph_format = data.get('graph_format', 'base64')
+    commands = [cmd.strip() for cmd in commands]
+
+    arithmetic = []
+    heavy = []
+    for i, text in enumerate(commands):
+        try:
+            plain = bool(text) and is_plain_arithmetic(text)
+        except Exception:
+            plain = False
+        if plain:
+            arithmetic.append(i)
+        elif text:
+            heavy.append(i)
+
+    if not math_engine.check_rate_limit(client_id(), cost=max(1, len(heavy))):
+        return jsonify({'error': "Rate limit exceeded. Please slow down."}), 429
+    if not reserve_batch_slots(len(heavy)):
+        return jsonify({'error': "Server busy with other batches. Try again shortly."}), 429
+    pending = {i: submit_batch_command(commands[i], graph_format) for i in heavy}
+
+    try:
+        values = math_engine.evaluate_batch([commands[i] for i in arithmetic])
+        evaluated = {i: evaluation_response(value) for i, value in zip(arithmetic, values)}
+    except Exception:
+        traceback.print_exc()
+        evaluated = {}  # Arithmetic is cheap: evaluate one by one below
+
+    def generate():
+        for i, text in enumerate(commands):
+            if i in evaluated:
+                response = evaluated[i]
+            elif i in pending or text:
+                try:
+                    result = pending[i].result() if i in pending else process_single_command(text, graph_format)
+                    response = apply_graph_format(result, graph_format)
+                except Exception as e:
+                    response = {'speech': "Something went wrong while calculating.", 'result': f"Error: {str(e)}"}
+            else:
+                response = {'result': 'No command received'}
+            yield json.dumps({'index': i, 'command': text, **response}) + '\n'
+
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+# Uploads larger than this are refused with a 413 while the body streams in
+UPLOAD_MAX_BYTES = int(os.environ.get('CALC_UPLOAD_MAX_BYTES', 8 * 1024 * 1024))
+
+
+class InMemoryRequest(Request):
+    """Request whose uploaded files are parsed into memory, never a temp file on disk.
+
+    Each request gets its own buffer, so concurrent uploads cannot overwrite
+    each other; the size cap above bounds the memory used.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
+
+
+app.request_class = InMemoryRequest
+
+
+def image_response(text, result, regions=None):
+    response = {
+        'text': text,
+        'result': result,
+        'speech': f"Found text: {text}. Result is {result}" if result else f"Found text: {text}"
+    }
+    if regions is not None:
+        response['regions'] = regions
+    return response
+
+
+def read_region(img, box):
+    """OCR one line/problem of a worksheet and run it as a command; None if OCR failed."""
+    try:
+        text = image_handler.recognize(img, box)
+    except Exception:
+        return None
+    region = (process_single_command(text, graph_format='data') if text
+              else {'speech': '', 'result': '', 'graph': None, 'action': None})
+    region['text'] = text
+    region['box'] = list(box)
+    return region
+
+
+def read_image(data):
+    """Response for an uploaded image, from ocr_cache if this image (or a near copy) was read before.
+
+    The image is split into line/problem regions that are read and evaluated
+    in parallel; each region is answered like a typed command.
+    """
+    key = hashlib.sha256(data).hexdigest()
+    response = ocr_cache.get(key)
+    if response is not None:
+        return response
+    if image_handler.engine.backend is None:
+        return image_response(image_handler.NO_OCR, None)
+    try:
+        img = image_handler.load(io.BytesIO(data))
+    except Exception as e:
+        return image_response(str(e), None)
+
+    fingerprint = perceptual_hash(img)
+    response = ocr_cache.find(fingerprint)
+    if response is None:
+        boxes = image_handler.regions(img) or [(0, 0, img.width, img.height)]
+        regions = list(ocr_pool.map(lambda box: read_region(img, box), boxes))
+        if None in regions:
+            return image_response(image_handler.NO_TESSERACT, None)
+        regions = [region for region in regions if region['text']]
+        text = '\n'.join(region['text'] for region in regions)
+        if len(regions) > 1:
+            solved = sum(1 for region in regions if region['result'])
+            response = image_response(text, f"Solved {solved} of {len(regions)} problems", regions)
+            response['speech'] = f"Found {len(regions)} problems, solved {solved}"
+        else:
+            result = regions[0]['result'] if regions else None
+            response = image_response(text, result or None, regions)
+    ocr_cache.put(key, response, fingerprint)
+    return response
+
+
 @app.route('/upload_image', methods=['POST'])
 def upload_image():
-    if 'image' not in request.files:
+    request.max_content_length = UPLOAD_MAX_BYTES
+    try:
+        files = request.files
+    except RequestEntityTooLarge:
+        return jsonify({'error': f"Image too large (limit {UPLOAD_MAX_BYTES / 2 ** 20:.3g} MB)"}), 413
+    if 'image' not in files:
         return jsonify({'error': 'No image uploaded'})
 
-    file = request.files['image']
+    file = files['image']
     if file.filename == '':
         return jsonify({'error': 'No image selected'})
 
     try:
-        filepath = os.path.join('static', 'temp_upload.png')
-        file.save(filepath)
-
-        text = image_handler.extract_text(filepath)
-        result = math_engine.evaluate(text)
-
-        return jsonify({
-            'text': text,
-            'result': result,
-            'speech': f"Found text: {text}. Result is {result}" if result else f"Found text: {text}"
-        })
+        return jsonify(read_image(file.stream.getvalue()))
     except Exception as e:
         return jsonify({'error': str(e)})
 
+# ========== WARM-UP ==========
+# Representative traffic (mirrors the example chips in static/script.js)
+WARMUP_CORPUS = [
+    '5 plus 3',
+    'calculate 2 power 10 divided by 4',
+    'differentiate x squared',
+    'integrate 2x',
+    'solve x squared minus 4 equals 0',
+    'convert 100 celsius to fahrenheit',
+    'determinant of [[1,2],[3,4]]',
+    'plot x squared',
+    'plot x square plus y square equal to 25',
+    '3d plot x squared plus y squared',
+    '3d plot x^2+y^2+z^2=9',
+]
+WARMUP_REPORT = None
+
+
+def warm_up(corpus=None):
+    """Import every capability and run a corpus through the hot paths before serving.
+
+    Primes SymPy's caches, the matplotlib font cache and the 3D toolkit, and
+    fills the result/graph caches. Run in a preloading master (gunicorn
+    preload_app), the warmed pages are shared copy-on-write by forked workers.
+    """
+    global WARMUP_REPORT
+    start = time.perf_counter()
+    if startup_error():
+        return None
+    engine = math_engine.lazy_load()
+    figure_pool.lazy_load()
+    image_handler.lazy_load()
+    from calculator_logic import _import_ocr
+    _import_ocr()
+
+    # Run inline so the caches are primed in this process, not in pool workers
+    executor, engine.executor = engine.executor, None
+    timings = []
+    try:
+        for text in corpus or WARMUP_CORPUS:
+            t0 = time.perf_counter()
+            process_single_command(text)
+            timings.append({'command': text, 'seconds': round(time.perf_counter() - t0, 4)})
+    finally:
+        engine.executor = executor
+
+    WARMUP_REPORT = {'seconds': round(time.perf_counter() - start, 4), 'commands': timings}
+    return WARMUP_REPORT
+
+
+def start_workers():
+    """Spawn this process's SymPy worker pool (gunicorn post_fork hook)."""
+    if not startup_error() and math_engine.executor is not None:
+        math_engine.executor.start()
+
+
+def _warmup_corpus(setting):
+    """CALC_WARMUP is '1' for the built-in corpus or a file with one command per line."""
+    if setting.lower() in ('1', 'true', 'yes') or not os.path.isfile(setting):
+        return None
+    with open(setting, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+if GLOBAL_ERROR is None and os.environ.get('CALC_WARMUP'):
+    warm_up(_warmup_corpus(os.environ['CALC_WARMUP']))
+
+
 if __name__ == '__main__':
     import webbrowser
     from threading import Timer
@@ -0,0 +1,133 @@
+import ast
+import math
+import operator
+from fractions import Fraction
+
+
+# Integer literals stay exact (SymPy Integer/Rational); decimal literals are
+# 53-bit floats, like SymPy Floats at the default precision
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+_CONSTANTS = {
+    'pi': math.pi,
+    'E': math.e,
+}
+
+# Larger integer powers are left to SymPy rather than built digit by digit here
+MAX_EXPONENT = 1024
+# Floats carry an absolute error that grows with the argument, which trig
+# functions turn straight into output error (amplified near tan's poles)
+MAX_TRIG_ARGUMENT = 1e4
+MAX_TAN = 100
+
+
+def _trig(func, limit=None):
+    def wrapped(value):
+        if abs(value) > MAX_TRIG_ARGUMENT:
+            raise Unsupported(value)
+        result = func(value)
+        if limit is not None and abs(result) > limit:
+            raise Unsupported(result)
+        return result
+    return wrapped
+
+
+_FUNCTIONS = {
+    'sin': _trig(math.sin),
+    'cos': _trig(math.cos),
+    'tan': _trig(math.tan, MAX_TAN),
+    'exp': math.exp,
+    'log': math.log,
+    'ln': math.log,
+    'abs': abs,
+}
+
+
+class Unsupported(Exception):
+    """The expression uses something the fast path does not handle."""
+
+
+def evaluate_arithmetic(text):
+    """Evaluate a pure-number expression without SymPy.
+
+    Returns a Fraction when the result is exact, a float otherwise, or None
+    when the text has symbols, implicit multiplication or any construct
+    outside the whitelist, or the arithmetic fails (division by zero,
+    domain errors, overflow) - those are left to SymPy.
+    """
+    if '_' in text:
+        return None
+    try:
+        tree = ast.parse(text, mode='eval')
+        value = _eval(tree.body)
+    except (SyntaxError, Unsupported, ArithmeticError, ValueError, TypeError):
+        return None
+    if isinstance(value, int):
+        return Fraction(value)
+    if isinstance(value, (Fraction, float)):
+        return value
+    return None
+
+
+def _eval(node):
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise Unsupported(node.value)
+        return Fraction(node.value) if isinstance(node.value, int) else node.value
+    if isinstance(node, ast.BinOp):
+        if isinstance(node.op, ast.Pow):
+            return _power(_eval(node.left), _eval(node.right))
+        op = _BINARY_OPS.get(type(node.op))
+        if op is None:
+            raise Unsupported(node.op)
+        return op(_eval(node.left), _eval(node.right))
+    if isinstance(node, ast.UnaryOp):
+        op = _UNARY_OPS.get(type(node.op))
+        if op is None:
+            raise Unsupported(node.op)
+        return op(_eval(node.operand))
+    if isinstance(node, ast.Name):
+        if node.id not in _CONSTANTS:
+            raise Unsupported(node.id)
+        return _CONSTANTS[node.id]
+    if isinstance(node, ast.Call):
+        if (not isinstance(node.func, ast.Name) or node.keywords
+                or node.func.id not in _FUNCTIONS and node.func.id != 'sqrt'):
+            raise Unsupported(node)
+        args = [_eval(arg) for arg in node.args]
+        if node.func.id == 'sqrt':
+            if len(args) != 1:
+                raise Unsupported(node)
+            return _sqrt(args[0])
+        return _FUNCTIONS[node.func.id](*args)
+    raise Unsupported(node)
+
+
+def _power(base, exponent):
+    if isinstance(exponent, Fraction) and exponent.denominator == 1:
+        if abs(exponent) > MAX_EXPONENT:
+            raise Unsupported(exponent)
+        return base ** int(exponent)
+    value = float(base) ** float(exponent)
+    if isinstance(value, complex):
+        raise Unsupported(value)
+    return value
+
+
+def _sqrt(value):
+    """Exact root of perfect-square rationals (SymPy keeps those exact), float otherwise."""
+    if isinstance(value, Fraction) and value >= 0:
+        num, den = math.isqrt(value.numerator), math.isqrt(value.denominator)
+        if num * num == value.numerator and den * den == value.denominator:
+            return Fraction(num, den)
+    return math.sqrt(value)
@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+
+os.environ.setdefault('MPLCONFIGDIR', '/tmp')
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import sympy
+
+from figures import FigurePool, _style_2d, _style_3d
+from sampling import trace_implicit
+
+
+def best_of(func, repeat=5):
+    """Fastest wall time of func() over a few runs, in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def bench_implicit():
+    """Implicit 2D curves: dense 400x400 grid + contour vs trace_implicit.
+
+    'compute' is evaluation plus curve extraction (contourpy is what
+    plt.contour uses); 'render' includes drawing the figure.
+    """
+    import contourpy
+
+    print(f"\n--- Implicit Curves (400x400 contour vs marching squares) ---\n")
+    x, y = sympy.symbols('x y')
+    curves = ['x**2 + y**2 - 25', 'y**2 - 4*x', 'x*y - 1', 'x**2 - y**2 - 4',
+              '(x**2 + y**2)**2 - 50*(x**2 - y**2)', 'sin(x) - y', 'sin(x)*cos(y) + exp(-x**2/50) - 1']
+    bound = 12
+    print(f"  {'curve':<36} {'evals grid/traced':>18} {'compute ms':>14} {'render ms':>14}")
+    for curve in curves:
+        f = sympy.lambdify((x, y), sympy.sympify(curve), modules=['numpy'])
+
+        def grid():
+            xs = np.linspace(-bound, bound, 400)
+            X, Y = np.meshgrid(xs, xs)
+            return X, Y, f(X, Y)
+
+        def contour():
+            return contourpy.contour_generator(*grid()).lines(0)
+
+        def traced():
+            return trace_implicit(f, (-bound, bound), (-bound, bound))[0]
+
+        def render_contour():
+            fig, ax = plt.subplots()
+            ax.contour(*grid(), [0])
+            fig.canvas.draw()
+            plt.close(fig)
+
+        def render_traced():
+            fig, ax = plt.subplots()
+            for line in traced():
+                ax.plot(line[:, 0], line[:, 1])
+            fig.canvas.draw()
+            plt.close(fig)
+
+        _, evaluations = trace_implicit(f, (-bound, bound), (-bound, bound))
+        print(f"  {curve:<36} {400 * 400:>9}/{evaluations:<8} "
+              f"{best_of(contour):>6.1f}/{best_of(traced):<7.1f} "
+              f"{best_of(render_contour):>6.1f}/{best_of(render_traced):<7.1f}")
+
+
+def bench_figures():
+    """Per-graph figure setup: new pyplot figure + styling vs FigurePool reuse.
+
+    'setup' is creating (or acquiring) and releasing a styled figure;
+    'render' also draws a curve and saves a PNG.
+    """
+    import io
+
+    print(f"\n--- Figures (new pyplot figure vs pooled figure) ---\n")
+    pool = FigurePool()
+    xs = np.linspace(-10, 10, 400)
+    ys = np.sin(xs)
+
+    def fresh(is_3d):
+        fig = plt.figure(figsize=(7, 5))
+        if is_3d:
+            ax = fig.add_subplot(111, projection='3d')
+            _style_3d(ax)
+        else:
+            ax = fig.add_subplot(111)
+            _style_2d(ax)
+        return fig, ax
+
+    def draw(fig, ax):
+        ax.plot(xs, ys)
+        fig.savefig(io.BytesIO(), format='png', dpi=80)
+
+    print(f"  {'kind':<6} {'setup ms new/pooled':>22} {'render ms new/pooled':>22}")
+    for is_3d in (False, True):
+        def setup_fresh():
+            plt.close(fresh(is_3d)[0])
+
+        def setup_pooled():
+            pool.release(pool.acquire(is_3d)[1])
+
+        def render_fresh():
+            fig, ax = fresh(is_3d)
+            draw(fig, ax)
+            plt.close(fig)
+
+        def render_pooled():
+            fig, ax = pool.acquire(is_3d)
+            draw(fig, ax)
+            pool.release(ax)
+
+        print(f"  {'3d' if is_3d else '2d':<6} "
+              f"{best_of(setup_fresh):>10.1f}/{best_of(setup_pooled):<11.1f} "
+              f"{best_of(render_fresh):>10.1f}/{best_of(render_pooled):<11.1f}")
+
+
+def bench_arithmetic():
+    """Plain arithmetic: AST fast path vs the SymPy parse + evalf path."""
+    from calculator_logic import MathEngine
+
+    print(f"\n--- Arithmetic (fast path vs SymPy) ---\n")
+    engine = MathEngine()
+    cases = ['5+5', '12*7', '100/7', '2**10', '0.1+0.2', 'sqrt(16)+1/3', 'sin(0.5)*3', '(3+4)*(5-2)/7']
+    print(f"  {'expression':<16} {'result':>10} {'sympy ms':>10} {'fast ms':>10}")
+    for text in cases:
+        def sympy_path():
+            return engine._evaluate_expr(engine._parse_safe(text))
+
+        def fast_path():
+            return engine._fast_evaluate(text)
+
+        print(f"  {text:<16} {fast_path():>10} {best_of(sympy_path):>10.3f} {best_of(fast_path):>10.3f}")
+
+
+if __name__ == "__main__":
+    sections = {'implicit': bench_implicit, 'figures': bench_figures,
+                'arithmetic': bench_arithmetic}
+    for name in sys.argv[1:] or sections:
+        sections[name]()
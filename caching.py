@@ -0,0 +1,298 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Size-bounded, thread-safe least-recently-used cache with hit/miss counters.
+
+    Entries optionally expire ``ttl`` seconds after they were stored.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, self._MISSING)
+            if entry is self._MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def _drop(self, key):
+        """Remove an entry; caller holds the lock."""
+        del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def stats(self):
+        """Return a snapshot of the counters for monitoring."""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class SQLiteStore:
+    """Persistent string -> JSON store backed by SQLite, shareable across worker processes.
+
+    Every prune_every puts, expired rows are deleted and, past max_rows, the
+    oldest rows too, so the file stays bounded even for keys never read again.
+    """
+
+    def __init__(self, path, ttl=None, max_rows=None, prune_every=64):
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.prune_every = prune_every
+        self.pruned = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._inherited = []
+
+    @property
+    def _conn(self):
+        """This process's connection, opened on first use; caller holds the lock.
+
+        A SQLite connection must not be used across fork(), so a process
+        forked from one that already had it open (gunicorn preload_app)
+        opens its own. The inherited one is kept, not closed, so closing it
+        can't disturb the parent's locks or WAL.
+        """
+        if self._pid != os.getpid():
+            if self._pid is not None:
+                self._inherited.append(self._connection)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+            except sqlite3.Error:
+                pass
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS cache_created ON cache (created)')
+            self._connection, self._pid = conn, os.getpid()
+        return self._connection
+
+    def get(self, key, default=None):
+        try:
+            with self._lock:
+                row = self._conn.execute('SELECT value, created FROM cache WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    return default
+                if self.ttl and row[1] + self.ttl <= time.time():
+                    self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+                    return default
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError):
+            return default
+
+    def put(self, key, value):
+        try:
+            payload = json.dumps(value)
+            with self._lock:
+                self._conn.execute('INSERT OR REPLACE INTO cache (key, value, created) VALUES (?, ?, ?)',
+                                   (key, payload, time.time()))
+                self._puts += 1
+                if self._puts % self.prune_every == 0:
+                    self._prune()
+        except (sqlite3.Error, TypeError, ValueError):
+            pass
+
+    def _prune(self):
+        """Delete expired rows, then the oldest beyond max_rows; caller holds the lock."""
+        if self.ttl:
+            self.pruned += self._conn.execute('DELETE FROM cache WHERE created <= ?',
+                                              (time.time() - self.ttl,)).rowcount
+        if self.max_rows:
+            self.pruned += self._conn.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY created DESC LIMIT -1 OFFSET ?)',
+                (self.max_rows,)).rowcount
+
+    def clear(self):
+        try:
+            with self._lock:
+                self._conn.execute('DELETE FROM cache')
+        except sqlite3.Error:
+            pass
+
+    def __len__(self):
+        try:
+            with self._lock:
+                return self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+
+class ResultCache:
+    """In-memory LRU/TTL cache in front of an optional on-disk SQLite store.
+
+    Values must be JSON-serializable so they survive a worker restart.
+    """
+
+    def __init__(self, maxsize=512, ttl=None, path=None, max_rows=100000):
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SQLiteStore(path, ttl=ttl, max_rows=max_rows) if path else None
+        self.disk_hits = 0
+
+    def get(self, key, default=None):
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.disk_hits += 1
+                self.memory.put(key, value)
+        return default if value is None else value
+
+    def put(self, key, value):
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        stats = self.memory.stats()
+        stats['disk_hits'] = self.disk_hits
+        stats['disk_path'] = self.disk.path if self.disk is not None else None
+        stats['disk_pruned'] = self.disk.pruned if self.disk is not None else 0
+        return stats
+
+
+class ByteLRUCache(LRUCache):
+    """LRU cache of bytes values bounded by their total size rather than entry count."""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=None):
+        super().__init__(maxsize=None, ttl=ttl)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+
+    def _drop(self, key):
+        value, _ = self._data.pop(key)
+        self.total_bytes -= len(value)
+
+    def put(self, key, value):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.total_bytes -= len(old[0])
+            self._data[key] = (value, expires_at)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (evicted, _) = self._data.popitem(last=False)
+                self.total_bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats['bytes'] = self.total_bytes
+            stats['max_bytes'] = self.max_bytes
+        return stats
+
+
+class SimilarityCache(LRUCache):
+    """LRU cache whose entries can also be found by a similar fingerprint.
+
+    Each entry is stored under an exact key (e.g. a content hash) together
+    with a fingerprint (e.g. a perceptual hash). find() returns the entry
+    whose fingerprint is closest, if it is within max_distance, so
+    near-duplicates - a re-encoded or re-photographed image - share an entry.
+    distance(a, b) defaults to the number of differing bits of two ints.
+    """
+
+    def __init__(self, maxsize=256, max_distance=8, distance=None, ttl=None):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.max_distance = max_distance
+        self.distance = distance or (lambda a, b: (a ^ b).bit_count())
+        self.similar_hits = 0
+
+    def get(self, key, default=None):
+        entry = super().get(key, self._MISSING)
+        return default if entry is self._MISSING else entry[1]
+
+    def put(self, key, value, fingerprint=None):
+        super().put(key, (fingerprint, value))
+
+    def find(self, fingerprint, default=None):
+        now = time.monotonic()
+        with self._lock:
+            best, best_distance = None, None
+            for key, ((stored, _), expires_at) in self._data.items():
+                if stored is None or (expires_at is not None and expires_at <= now):
+                    continue
+                distance = self.distance(stored, fingerprint)
+                if distance <= self.max_distance and (best_distance is None or distance < best_distance):
+                    best, best_distance = key, distance
+            if best is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(best)
+            self.similar_hits += 1
+            return self._data[best][0][1]
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats['similar_hits'] = self.similar_hits
+            stats['max_distance'] = self.max_distance
+        return stats
@@ -1,19 +1,160 @@
 import sympy
 from sympy import latex as sympy_latex
 from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application
-try:
-    import pytesseract
-except ImportError:
-    pytesseract = None
-from PIL import Image
+import math
 import re
-import time
+from arithmetic import evaluate_arithmetic
+from caching import LRUCache, ResultCache
+from executor import ComputationTimeout
+from rate_limit import MemoryRateLimiter
+from lazy import timed_import
+import units
+
+
+# ========== VOICE NORMALIZATION TABLES ==========
+# Word numbers to digits
+WORD_NUMBERS = {
+    'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
+    'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
+    'ten': '10', 'eleven': '11', 'twelve': '12', 'thirteen': '13',
+    'fourteen': '14', 'fifteen': '15', 'sixteen': '16', 'seventeen': '17',
+    'eighteen': '18', 'nineteen': '19', 'twenty': '20', 'thirty': '30',
+    'forty': '40', 'fifty': '50', 'sixty': '60', 'seventy': '70',
+    'eighty': '80', 'ninety': '90', 'hundred': '100', 'thousand': '1000',
+    'million': '1000000',
+}
+
+# Specific constructs "X of Y and Z" or "Op X by Y" (order matters)
+CONSTRUCTS = {
+    "sum of": "+",
+    "addition of": "+",
+    "difference of": "-",
+    "subtraction of": "-",
+    "product of": "*",
+    "multiplication of": "*",
+    "division of": "/",
+    "multiply": "*",
+    "divide": "/",
+}
+
+# Basic math symbols
+REPLACEMENTS = {
+    "of": "",
+    "plus": "+",
+    "minus": "-",
+    "times": "*",
+    "multiplied by": "*",
+    "divided by": "/",
+    "over": "/",
+    "into": "*",
+    "equal to": "=",
+    "equals": "=",
+    "equal": "=",
+    "is": "=",
+    "square": "**2",
+    "squared": "**2",
+    "cube": "**3",
+    "cubed": "**3",
+    "square root of": "sqrt(",
+    "root of": "sqrt(",
+    "power": "**",
+    "raised to": "**",
+    "^": "**",
+    "sine": "sin",
+    "cosine": "cos",
+    "tangent": "tan",
+    "logarithm": "log",
+    "exponential": "exp",
+    "oneplus": "1+",
+    "and": "+",  # Fallback for "1 and 2"
+}
+
+# Action keywords stripped from the expression by parse_intent
+INTENT_KEYWORDS = ["plot", "graph", "draw", "3d", "solve", "find x", "find the value of",
+                   "differentiate", "derivative of", "derivative", "derive",
+                   "integrate", "integral of", "integral", "calculate"]
+
+
+# get_intercepts: polynomials up to this degree are solved exactly, anything
+# else is scanned numerically for at most this many seconds
+INTERCEPT_SYMBOLIC_DEGREE = 2
+INTERCEPT_TIME_BUDGET = 0.25
+
+# Compiled numeric kernels shared by the web and desktop plotting paths
+_lambdify_cache = LRUCache(maxsize=256)
+
+
+def cached_lambdify(args, expr, modules=('numpy',)):
+    """sympy.lambdify, memoized on (arguments, expression, modules).
+
+    lambdify generates and exec()s source code on every call, so repeated
+    plots and level sweeps reuse the same compiled function instead.
+    """
+    if not isinstance(args, (tuple, list)):
+        args = (args,)
+    modules = tuple(modules) if isinstance(modules, (tuple, list)) else (modules,)
+    key = (tuple(args), expr, modules)
+    func = _lambdify_cache.get(key)
+    if func is None:
+        func = sympy.lambdify(args, expr, modules=list(modules))
+        _lambdify_cache.put(key, func)
+    return func
+
+
+class Intent(dict):
+    """Read-only intent dict, safe to share between callers through the intent cache."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Intent is read-only; use .copy() for a mutable dict")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def copy(self):
+        return dict(self)
 
 
 class MathEngine:
-    def __init__(self):
+    def __init__(self, intent_cache_size=1024, result_cache_size=512, result_cache_ttl=None,
+                 result_cache_path=None, result_cache_rows=100000, executor=None, rate_limiter=None):
         self.transformations = (standard_transformations + (implicit_multiplication_application,))
-        self._request_times = []  # For rate limiting
+        # Per-client limiter; any rate_limit.RateLimiter backend can be plugged in
+        self.rate_limiter = rate_limiter if rate_limiter is not None else MemoryRateLimiter()
+        self._intent_cache = LRUCache(maxsize=intent_cache_size)
+        self._intercept_cache = LRUCache(maxsize=256)
+        self._template_cache = LRUCache(maxsize=256)  # evaluate_batch kernels
+        # evaluate/solve/derive/integrate results, keyed on the canonical SymPy tree
+        self._result_cache = ResultCache(maxsize=result_cache_size, ttl=result_cache_ttl,
+                                         path=result_cache_path, max_rows=result_cache_rows)
+        # Optional executor.SymbolicExecutor for heavy SymPy jobs with deadlines
+        self.executor = executor
+        self._compile_normalizer()
+
+    def _compile_normalizer(self):
+        """Precompile the regexes used by clean_voice_text (built once per engine)."""
+        self._filler_re = re.compile(r'^(?:lord|hey|hi|calculator|please|ok|okay)\s*')
+        self._number_re = re.compile(r'\b(?:' + '|'.join(WORD_NUMBERS) + r')\b')
+
+        self._construct_patterns = [(re.compile(r'\b' + word + r'\b'), op) for word, op in CONSTRUCTS.items()]
+        self._construct_re = re.compile(r'\b(?:' + '|'.join(CONSTRUCTS) + r')\b')
+
+        # Longest phrase first so 'square root of' beats 'square' and 'of'
+        sorted_keys = sorted(REPLACEMENTS.keys(), key=len, reverse=True)
+        self._replace_re = re.compile('|'.join(re.escape(k) for k in sorted_keys))
+        # Phrases that are replaced before the fallback 'and' and introduce an operator
+        self._op_words = frozenset(k for k in sorted_keys
+                                   if len(k) > len("and") and any(op in REPLACEMENTS[k] for op in "+-*/"))
+
+        self._op_space_re = re.compile(r'\s*(\*\*|\+|\-|\*|/|=)\s*')
+        self._space_re = re.compile(r'\s+')
+        self._list_comma_re = re.compile(r'(\d+)\s*,\s*(\d+)')
+        self._div_zero_re = re.compile(r'/\s*0(\.0*)?\s*$|/\s*0(\.0*)?\s*[^.]')
+        self._constant_re = re.compile(r'\d+\.?\d*|\.\d+')
+        unit = r"(?:(?:square|sq|cubic|cu)\s+)?[a-z°µ][\w°µ/*^]*(?:\s+per\s+[a-z°µ][\w°µ/*^]*)?"
+        self._unit_conversion_re = re.compile(rf'(?:convert\s+)?(-?[\d.]+)\s*({unit})\s+(?:to|in|into)\s+({unit})')
+
+        # Action keywords in their cleaned form, as parse_intent matches them
+        self._intent_keywords = [self.clean_voice_text(k) for k in INTENT_KEYWORDS]
 
     def _parse_safe(self, text):
         """Parse text into a SymPy expression, handling implicit multiplication."""
@@ -38,33 +179,49 @@ class MathEngine:
         return result
 
     def get_intercepts(self, expr_str):
-        """Find x and y intercepts for a 2D expression (LHS-RHS format)."""
+        """Find x and y intercepts for a 2D expression (LHS-RHS format), memoized per expression."""
+        intercepts = self._intercept_cache.get(expr_str)
+        if intercepts is None:
+            try:
+                intercepts = tuple(self.run_job('INTERCEPTS', '_get_intercepts_uncached', expr_str))
+            except ComputationTimeout:
+                intercepts = ()  # Fall back to default plot bounds
+            self._intercept_cache.put(expr_str, intercepts)
+        return list(intercepts)
+
+    def _get_intercepts_uncached(self, expr_str):
         x_sym, y_sym = sympy.symbols('x y')
         try:
             expr = sympy.sympify(expr_str)
-            intercepts = []
-            
-            # y-intercepts: set x = 0
-            # Solve returns a list of values for the variable
-            y_solutions = sympy.solve(expr.subs(x_sym, 0), y_sym)
-            for y_val in y_solutions:
-                try:
-                    if float(y_val) or y_val == 0:
-                        intercepts.append((0, float(y_val)))
-                except (TypeError, ValueError): continue
-            
-            # x-intercepts: set y = 0
-            x_solutions = sympy.solve(expr.subs(y_sym, 0), x_sym)
-            for x_val in x_solutions:
-                try:
-                    if float(x_val) or x_val == 0:
-                        intercepts.append((float(x_val), 0))
-                except (TypeError, ValueError): continue
-            
+            # y-intercepts: set x = 0; x-intercepts: set y = 0
+            intercepts = [(0, y_val) for y_val in self._axis_roots(expr.subs(x_sym, 0), y_sym)]
+            intercepts += [(x_val, 0) for x_val in self._axis_roots(expr.subs(y_sym, 0), x_sym)]
             return intercepts
         except Exception:
             return []
 
+    def _axis_roots(self, expr, var):
+        """Real roots of expr in var: exact for low-degree polynomials, numeric otherwise.
+
+        sympy.solve on transcendental equations can take seconds and often
+        finds nothing; the numeric scan is a few milliseconds.
+        """
+        if expr.free_symbols != {var}:
+            return []
+        polynomial = expr.is_polynomial(var)
+        if polynomial and sympy.degree(expr, var) <= INTERCEPT_SYMBOLIC_DEGREE:
+            roots = []
+            for val in sympy.solve(expr, var):
+                try:
+                    roots.append(float(val))
+                except (TypeError, ValueError):
+                    continue
+            return roots
+        from sampling import find_roots
+        # Polynomials keep every real root, as solve gave them; periodic
+        # functions keep only the ones nearest the origin
+        return find_roots(cached_lambdify(var, expr), budget=INTERCEPT_TIME_BUDGET, nearest=not polynomial)
+
     def _latex_result(self, expr):
         """Convert SymPy expression to LaTeX string for KaTeX rendering."""
         return sympy_latex(expr)
@@ -94,110 +251,101 @@ class MathEngine:
         return pretty
 
     def clean_voice_text(self, text):
-        """Regex-based pre-processor to convert natural language to math syntax."""
+        """Single-pass pre-processor to convert natural language to math syntax."""
         text = text.lower().strip()
-        
+
         # 0. Strip filler words from the beginning
-        text = re.sub(r'^(?:lord|hey|hi|calculator|please|ok|okay)\s*', '', text)
-
-        # Word numbers to digits
-        word_numbers = {
-            'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
-            'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
-            'ten': '10', 'eleven': '11', 'twelve': '12', 'thirteen': '13',
-            'fourteen': '14', 'fifteen': '15', 'sixteen': '16', 'seventeen': '17',
-            'eighteen': '18', 'nineteen': '19', 'twenty': '20', 'thirty': '30',
-            'forty': '40', 'fifty': '50', 'sixty': '60', 'seventy': '70',
-            'eighty': '80', 'ninety': '90', 'hundred': '100', 'thousand': '1000',
-            'million': '1000000',
-        }
-        for word, digit in word_numbers.items():
-            text = re.sub(r'\b' + word + r'\b', digit, text)
+        text = self._filler_re.sub('', text, count=1)
+
+        # 1. Word numbers to digits
+        text = self._number_re.sub(lambda m: WORD_NUMBERS[m.group()], text)
 
         # 2. Specific constructs "X of Y and Z" or "Op X by Y"
-        # We use word boundaries to avoid partial matches (e.g., 'divide' matching 'divided')
-        constructs = {
-            "sum of": "+",
-            "addition of": "+",
-            "difference of": "-",
-            "subtraction of": "-",
-            "product of": "*",
-            "multiplication of": "*",
-            "division of": "/",
-            "multiply": "*",
-            "divide": "/",
-        }
-        for word, op in constructs.items():
-            pattern = r'\b' + word + r'\b'
-            if re.search(pattern, text):
-                text = re.sub(pattern, "", text)
-                if "and" in text:
-                    text = text.replace("and", op)
-                elif "by" in text:
-                    text = text.replace("by", op)
-
-        # Basic math symbols
-        replacements = {
-            "of": "",
-            "plus": "+",
-            "minus": "-",
-            "times": "*",
-            "multiplied by": "*",
-            "divided by": "/",
-            "over": "/",
-            "into": "*",
-            "equal to": "=",
-            "equals": "=",
-            "equal": "=",
-            "is": "=",
-            "square": "**2",
-            "squared": "**2",
-            "cube": "**3",
-            "cubed": "**3",
-            "square root of": "sqrt(",
-            "root of": "sqrt(",
-            "power": "**",
-            "raised to": "**",
-            "^": "**",
-            "sine": "sin",
-            "cosine": "cos",
-            "tangent": "tan",
-            "logarithm": "log",
-            "exponential": "exp",
-            "oneplus": "1+",
-            "and": "+", # Fallback for "1 and 2"
-        }
-        
-        # Sort replacements by length descending
-        sorted_keys = sorted(replacements.keys(), key=len, reverse=True)
-        
-        for word in sorted_keys:
-            if word in ["and"] and any(op in text for op in ["+", "-", "*", "/"]):
-                 continue # Skip fallback 'and' if we already have an operator
-            text = text.replace(word, replacements[word])
+        # Rare in practice, so only walk the ordered table when one is present
+        if self._construct_re.search(text):
+            for pattern, op in self._construct_patterns:
+                if pattern.search(text):
+                    text = pattern.sub("", text)
+                    if "and" in text:
+                        text = text.replace("and", op)
+                    elif "by" in text:
+                        text = text.replace("by", op)
+
+        # 3. Basic math symbols in one scan (longest phrase wins).
+        # Fallback 'and' is kept if any operator is (or will be) present.
+        keep_and = "and" in text and (
+            any(op in text for op in "+-*/")
+            or any(m.group() in self._op_words for m in self._replace_re.finditer(text)))
+
+        def _replace(match):
+            word = match.group()
+            if word == "and" and keep_and:
+                return word
+            return REPLACEMENTS[word]
+
+        text = self._replace_re.sub(_replace, text)
 
         # Clean parentheses
         if "sqrt(" in text and ")" not in text:
             text += ")"
 
         # Special: remove spaces around operators for cleaner parsing
-        text = re.sub(r'\s*(\*\*|\+|\-|\*|/|=)\s*', r'\1', text)
-        
+        text = self._op_space_re.sub(r'\1', text)
+
         # Collapse multiple spaces
-        text = re.sub(r'\s+', ' ', text)
-        
+        text = self._space_re.sub(' ', text)
+
         # Special for lists: convert '1, 2, 3' or '1 2 3' after '=' to space-separated values
         # If there's an '=' and the RHS looks like a list
         if "=" in text:
             lhs, rhs = text.split("=", 1)
             # If RHS contains commas between digits, keep them but normalize spaces
-            rhs = re.sub(r'(\d+)\s*,\s*(\d+)', r'\1,\2', rhs)
+            rhs = self._list_comma_re.sub(r'\1,\2', rhs)
             text = f"{lhs}={rhs}"
 
         return text.strip()
 
     def parse_intent(self, text):
-        """Analyze voice text and return structured JSON with action + expression."""
+        """Analyze voice text and return structured JSON with action + expression (memoized)."""
+        intent = self._intent_cache.get(text)
+        if intent is None:
+            intent = self._parse_intent_uncached(text)
+            self._intent_cache.put(text, intent)
+        return intent
+
+    def cache_stats(self):
+        """Hit/miss/eviction counters of the engine caches, for monitoring."""
+        return {
+            'intent': self._intent_cache.stats(),
+            'intercepts': self._intercept_cache.stats(),
+            'lambdify': _lambdify_cache.stats(),
+            'batch_templates': self._template_cache.stats(),
+            'units': units.unit_cache.stats(),
+            'unit_conversions': units.conversion_cache.stats(),
+            'result': self._result_cache.stats(),
+        }
+
+    def _result_key(self, action, expr):
+        """Cache key from the canonical SymPy tree, so 'x squared' and 'x^2' share an entry."""
+        return f"{action}:{sympy.srepr(expr)}"
+
+    def run_job(self, action, method, *args):
+        """Call self.<method>(*args), in the executor's worker pool when it handles this action."""
+        if self.executor is not None and self.executor.handles(action):
+            return self.executor.run(action, method, *args)
+        return getattr(self, method)(*args)
+
+    def _cached_result(self, action, expr, method, *args):
+        """Return self.<method>(*args) for expr, answering repeats from the result cache."""
+        key = self._result_key(action, expr)
+        result = self._result_cache.get(key)
+        if result is None:
+            result = self.run_job(action, method, *args)
+            if result is not None:
+                self._result_cache.put(key, result)
+        return dict(result) if isinstance(result, dict) else result
+
+    def _parse_intent_uncached(self, text):
         clean_text = self.clean_voice_text(text)
         action = "CALCULATE"
         
@@ -219,11 +367,7 @@ class MathEngine:
 
         # Strip action keywords from the expressions
         expr = clean_text
-        keywords = ["plot", "graph", "draw", "3d", "solve", "find x", "find the value of", 
-                    "differentiate", "derivative of", "derivative", "derive", 
-                    "integrate", "integral of", "integral", "calculate"]
-        for k in keywords:
-            cleaned_k = self.clean_voice_text(k)
+        for cleaned_k in self._intent_keywords:
             # Remove from start of text primarily to avoid stripping math content
             if expr.startswith(cleaned_k):
                 expr = expr[len(cleaned_k):].strip()
@@ -262,100 +406,51 @@ class MathEngine:
         if "y" in expr: vars.append("y")
         if "z" in expr: vars.append("z")
         
-        return {
-            "action": action,
-            "expression": expr,
-            "levels": levels,
-            "variables": vars if vars else ["x"]
-        }
+        return Intent(
+            action=action,
+            expression=expr,
+            levels=tuple(levels),
+            variables=tuple(vars) if vars else ("x",),
+        )
 
     def _clean_calculus_input(self, text):
         """Refactored to use central cleaner."""
         return self.clean_voice_text(text)
 
     # ========== RATE LIMITING ==========
-    def check_rate_limit(self, max_requests=30, window_seconds=60):
-        """Returns True if within rate limit, False if exceeded."""
-        now = time.time()
-        self._request_times = [t for t in self._request_times if now - t < window_seconds]
-        if len(self._request_times) >= max_requests:
-            return False
-        self._request_times.append(now)
-        return True
+    def check_rate_limit(self, client_id='global', cost=1):
+        """Returns True if client_id is within rate limit, False if exceeded (cost: requests charged)."""
+        return self.rate_limiter.allow(client_id, cost)
 
     # ========== UNIT CONVERSIONS ==========
     def check_unit_conversion(self, text):
-        """Handle unit conversion commands."""
+        """Handle unit conversion commands, between any two units of the same dimension (see units.py)."""
         text = text.lower().strip()
 
-        # Match patterns like "convert 5 km to miles"
-        pattern = r'(?:convert\s+)?([\d.]+)\s*([a-zA-Z°]+)\s+(?:to|in)\s+([a-zA-Z°]+)'
-        match = re.search(pattern, text)
+        # Match patterns like "convert 5 km to miles" or "60 miles per hour in m/s"
+        match = self._unit_conversion_re.search(text)
         if not match:
             return None
 
-        value = float(match.group(1))
-        from_unit = match.group(2).lower().strip()
-        to_unit = match.group(3).lower().strip()
-
-        conversions = {
-            # Length
-            ('km', 'miles'): lambda v: v * 0.621371,
-            ('miles', 'km'): lambda v: v * 1.60934,
-            ('m', 'feet'): lambda v: v * 3.28084,
-            ('m', 'ft'): lambda v: v * 3.28084,
-            ('feet', 'm'): lambda v: v / 3.28084,
-            ('ft', 'm'): lambda v: v / 3.28084,
-            ('cm', 'inches'): lambda v: v / 2.54,
-            ('cm', 'inch'): lambda v: v / 2.54,
-            ('inches', 'cm'): lambda v: v * 2.54,
-            ('inch', 'cm'): lambda v: v * 2.54,
-            ('m', 'cm'): lambda v: v * 100,
-            ('cm', 'm'): lambda v: v / 100,
-            ('km', 'm'): lambda v: v * 1000,
-            ('m', 'km'): lambda v: v / 1000,
-
-            # Weight
-            ('kg', 'lbs'): lambda v: v * 2.20462,
-            ('kg', 'pounds'): lambda v: v * 2.20462,
-            ('lbs', 'kg'): lambda v: v / 2.20462,
-            ('pounds', 'kg'): lambda v: v / 2.20462,
-            ('g', 'kg'): lambda v: v / 1000,
-            ('kg', 'g'): lambda v: v * 1000,
-
-            # Temperature
-            ('celsius', 'fahrenheit'): lambda v: v * 9/5 + 32,
-            ('c', 'f'): lambda v: v * 9/5 + 32,
-            ('°c', '°f'): lambda v: v * 9/5 + 32,
-            ('fahrenheit', 'celsius'): lambda v: (v - 32) * 5/9,
-            ('f', 'c'): lambda v: (v - 32) * 5/9,
-            ('°f', '°c'): lambda v: (v - 32) * 5/9,
-            ('celsius', 'kelvin'): lambda v: v + 273.15,
-            ('c', 'k'): lambda v: v + 273.15,
-            ('kelvin', 'celsius'): lambda v: v - 273.15,
-            ('k', 'c'): lambda v: v - 273.15,
-
-            # Speed
-            ('kmph', 'mph'): lambda v: v * 0.621371,
-            ('mph', 'kmph'): lambda v: v * 1.60934,
-
-            # Data
-            ('gb', 'mb'): lambda v: v * 1024,
-            ('mb', 'gb'): lambda v: v / 1024,
-            ('mb', 'kb'): lambda v: v * 1024,
-            ('kb', 'mb'): lambda v: v / 1024,
-        }
+        try:
+            value = float(match.group(1))
+        except ValueError:
+            return None
+        from_unit = self._space_re.sub(' ', match.group(2))
+        to_unit = self._space_re.sub(' ', match.group(3))
 
-        key = (from_unit, to_unit)
-        if key in conversions:
-            result = conversions[key](value)
-            if result == int(result):
-                result = int(result)
-            else:
-                result = round(result, 4)
-            return f"{value} {from_unit} = {result} {to_unit}"
+        result = units.convert(value, from_unit, to_unit)
+        if result is None:
+            return None
+        result = round(result, 4)
+        if result == int(result):
+            result = int(result)
+        return f"{value} {from_unit} = {result} {to_unit}"
 
-        return None
+    def convert_units(self, values, from_unit, to_unit):
+        """Convert a list of values between two units at once; a list of floats, or None."""
+        converted = units.convert_many(values, from_unit, to_unit)
+        return None if converted is None else converted.tolist()
 
     # ========== EQUATION SOLVING ==========
     def check_equation(self, text):
@@ -383,18 +478,23 @@ class MathEngine:
                     return None
                 equation = sympy.Eq(expr, 0)
 
-            solutions = sympy.solve(equation, x)
-            if not solutions:
-                return {'display': 'No real solutions found', 'speech': 'No real solutions found'}
-
-            pretty_solutions = [self._pretty_result(s) for s in solutions]
-            latex_solutions = [self._latex_result(s) for s in solutions]
-            speech = f"x equals {', '.join(pretty_solutions)}"
-            display = f"$$x = {', \\;'.join(latex_solutions)}$$"
-            return {'display': display, 'speech': speech}
+            return self._cached_result('SOLVE', equation, '_solve', equation, x)
+        except ComputationTimeout:
+            raise
         except Exception:
             return None
 
+    def _solve(self, equation, x):
+        solutions = sympy.solve(equation, x)
+        if not solutions:
+            return {'display': 'No real solutions found', 'speech': 'No real solutions found'}
+
+        pretty_solutions = [self._pretty_result(s) for s in solutions]
+        latex_solutions = [self._latex_result(s) for s in solutions]
+        speech = f"x equals {', '.join(pretty_solutions)}"
+        display = f"$$x = {', \\;'.join(latex_solutions)}$$"
+        return {'display': display, 'speech': speech}
+
     # ========== MATRIX OPERATIONS ==========
     def check_matrix(self, text):
         """Handle matrix operations like 'determinant of [[1,2],[3,4]]'."""
@@ -450,30 +550,135 @@ class MathEngine:
             return None
 
         # Division by zero check
-        if re.search(r'/\s*0(\.0*)?\s*$', expression) or re.search(r'/\s*0(\.0*)?\s*[^.]', expression):
+        if self._div_zero_re.search(expression):
             return "Error: Cannot divide by zero"
 
         try:
             if expression.count('(') > expression.count(')'):
                 expression += ')' * (expression.count('(') - expression.count(')'))
 
+            fast = self._fast_evaluate(expression)
+            if fast is not None:
+                return fast
+
             result = self._parse_safe(expression)
             if result is None:
                 return None
-            result = result.evalf()
-            val = float(result)
-            if val == float('inf') or val == float('-inf'):
-                return "Error: Cannot divide by zero"
-            if val != val:  # NaN check
-                return "Error: Undefined result"
-            if val.is_integer():
-                return str(int(val))
-            return str(round(val, 4))
+            return self._cached_result('EVALUATE', result, '_evaluate_expr', result)
         except ZeroDivisionError:
             return "Error: Cannot divide by zero"
         except Exception:
             return None
 
+    def _fast_evaluate(self, expression):
+        """Format a pure-number expression without SymPy, or None to take the SymPy path.
+
+        Exact (rational) results format exactly as SymPy's would. Float results
+        can differ from SymPy's evalf in the last bit, so the ones where that
+        could change the output - close to an integer or to a 4-decimal
+        rounding boundary - are left to SymPy.
+        """
+        value = evaluate_arithmetic(expression)
+        if value is None:
+            return None
+        if not isinstance(value, float):
+            # evalf rounds big exact numbers differently from float()
+            return self._format_number(float(value)) if abs(value) <= 2 ** 53 else None
+        if self._float_needs_sympy(value) or abs(value - round(value)) < 1e-9 * max(1.0, abs(value)):
+            return None
+        return self._format_number(value)
+
+    def _float_needs_sympy(self, value):
+        """True if a float computed outside SymPy could format differently from SymPy's result.
+
+        That is non-finite values, values beyond 2**53 (whose integer digits
+        differ), values that round to zero (an exact zero like sin(pi)*1e8
+        comes out as a tiny float: "0.0", where SymPy gives "0") and values at
+        a 4-decimal rounding boundary, where a last-bit difference changes the
+        output. Callers also check closeness to an integer.
+        """
+        if not math.isfinite(value) or abs(value) > 2 ** 53 or (value != 0 and round(value, 4) == 0):
+            return True
+        scaled = abs(value) * 1e4
+        return abs(scaled % 1 - 0.5) < 1e-9 * max(1.0, scaled)
+
+    def _evaluate_expr(self, expr):
+        return self._format_number(float(expr.evalf()))
+
+    def _format_number(self, val):
+        if val == float('inf') or val == float('-inf'):
+            return "Error: Cannot divide by zero"
+        if val != val:  # NaN check
+            return "Error: Undefined result"
+        if val.is_integer():
+            return str(int(val))
+        return str(round(val, 4))
+
+    # ========== BATCH EVALUATION ==========
+    def evaluate_batch(self, expressions):
+        """Evaluate many expressions with the same outputs as evaluate().
+
+        Pure arithmetic is grouped by shape: numeric literals become
+        placeholders, so '5 plus 3' and '7 plus 2' share the template
+        '_c0_+_c1_', which is parsed and lambdified once and evaluated over
+        all its constants as one NumPy array. Anything else, and any value
+        whose float formatting could differ from SymPy's, goes through
+        evaluate() individually.
+        """
+        import numpy as np
+
+        results = [None] * len(expressions)
+        groups = {}
+        for i, text in enumerate(expressions):
+            expression = self.clean_voice_text(text)
+            if not expression:
+                continue
+            if self._div_zero_re.search(expression):
+                results[i] = "Error: Cannot divide by zero"
+                continue
+            if expression.count('(') > expression.count(')'):
+                expression += ')' * (expression.count('(') - expression.count(')'))
+
+            constants = self._constant_re.findall(expression)
+            # Beyond 2**53 floats lose the exact integers SymPy would keep
+            if not constants or any(float(c) > 2 ** 53 for c in constants):
+                results[i] = self.evaluate(text)
+                continue
+            counter = iter(range(len(constants)))
+            template = self._constant_re.sub(lambda m: f"_c{next(counter)}_", expression)
+            groups.setdefault(template, []).append((i, text, [float(c) for c in constants]))
+
+        for template, items in groups.items():
+            kernel = self._batch_kernel(template, len(items[0][2]))
+            if kernel is None:
+                for i, text, _ in items:
+                    results[i] = self.evaluate(text)
+                continue
+            columns = np.array([constants for _, _, constants in items], dtype=float).T
+            with np.errstate(all='ignore'):
+                values = np.broadcast_to(np.asarray(kernel(*columns), dtype=float), (len(items),))
+            for (i, text, _), val in zip(items, values.tolist()):
+                # Let SymPy decide non-finite (complex, zoo), huge and almost-integer results
+                if (self._float_needs_sympy(val)
+                        or not val.is_integer() and abs(val - round(val)) < 1e-9 * max(1.0, abs(val))):
+                    results[i] = self.evaluate(text)
+                else:
+                    results[i] = self._format_number(val)
+        return results
+
+    def _batch_kernel(self, template, count):
+        """Parse and lambdify an arithmetic template once; None if it is not pure arithmetic."""
+        kernel = self._template_cache.get(template)
+        if kernel is None:
+            kernel = False
+            placeholders = [sympy.Symbol(f"_c{k}_") for k in range(count)]
+            expr = self._parse_safe(template)
+            if (expr is not None and expr.free_symbols == set(placeholders)
+                    and not expr.atoms(sympy.core.function.AppliedUndef)):
+                kernel = cached_lambdify(tuple(placeholders), expr)
+            self._template_cache.put(template, kernel)
+        return kernel or None
+
     # ========== CALCULUS ==========
     def check_calculus(self, text):
         text_lower = text.lower()
@@ -487,13 +692,9 @@ class MathEngine:
                 expr = self._parse_safe(expr_str)
                 if expr is None:
                     return None
-                result = sympy.diff(expr, x)
-                pretty = self._pretty_result(result)
-                latex_str = self._latex_result(result)
-                return {
-                    'display': f"Derivative: $$\\frac{{d}}{{dx}} {self._latex_result(expr)} = {latex_str}$$",
-                    'speech': f"Derivative is {pretty}"
-                }
+                return self._cached_result('DERIVE', expr, '_derive', expr, x)
+            except ComputationTimeout:
+                raise
             except Exception:
                 return None
 
@@ -506,19 +707,46 @@ class MathEngine:
                 expr = self._parse_safe(expr_str)
                 if expr is None:
                     return None
-                result = sympy.integrate(expr, x)
-                pretty = self._pretty_result(result)
-                latex_str = self._latex_result(result)
-                return {
-                    'display': f"Integral: $$\\int {self._latex_result(expr)} \\, dx = {latex_str} + C$$",
-                    'speech': f"Integral is {pretty} plus C"
-                }
+                return self._cached_result('INTEGRATE', expr, '_integrate', expr, x)
+            except ComputationTimeout:
+                raise
             except Exception:
                 return None
 
         return None
 
+    def _derive(self, expr, x):
+        result = sympy.diff(expr, x)
+        pretty = self._pretty_result(result)
+        latex_str = self._latex_result(result)
+        return {
+            'display': f"Derivative: $$\\frac{{d}}{{dx}} {self._latex_result(expr)} = {latex_str}$$",
+            'speech': f"Derivative is {pretty}"
+        }
+
+    def _integrate(self, expr, x):
+        result = sympy.integrate(expr, x)
+        pretty = self._pretty_result(result)
+        latex_str = self._latex_result(result)
+        return {
+            'display': f"Integral: $$\\int {self._latex_result(expr)} \\, dx = {latex_str} + C$$",
+            'speech': f"Integral is {pretty} plus C"
+        }
+
     # ========== GRAPHING ==========
+    def implicit_surface(self, expr, x_bound, y_bound, max_cells=4000):
+        """(vertices, triangles) of the surface expr(x, y, z) = 0, z spanning the x range.
+
+        Run through run_job('PLOT_3D', ...) so a surface that needs many
+        refined cells is cut off at the PLOT_3D deadline.
+        """
+        from sampling import isosurface
+        x, y, z = sympy.symbols('x y z')
+        vertices, triangles, _ = isosurface(cached_lambdify((x, y, z), expr, modules=['numpy']),
+                                            (-x_bound, x_bound), (-y_bound, y_bound), (-x_bound, x_bound),
+                                            max_cells=max_cells)
+        return vertices, triangles
+
     def is_graphing_command(self, text):
         return text.lower().startswith(('plot', 'graph', 'draw'))
 
@@ -534,16 +762,101 @@ class MathEngine:
         return False
 
 
+def _import_ocr():
+    """Import PIL on first OCR use; plain math never needs it."""
+    return timed_import('PIL.Image', 'ocr')
+
+
+# Longest side handed to Tesseract; phone photos are far larger than printed math needs
+OCR_MAX_SIDE = 1600
+
+
+def _otsu_threshold(histogram):
+    """Grey level that best separates a 256-bin histogram into ink and paper (Otsu's method)."""
+    total = sum(histogram)
+    weighted_total = sum(level * count for level, count in enumerate(histogram))
+    best, threshold = -1.0, 127
+    below = weighted_below = 0
+    for level, count in enumerate(histogram):
+        below += count
+        weighted_below += level * count
+        above = total - below
+        if below == 0 or above == 0:
+            continue
+        mean_below = weighted_below / below
+        mean_above = (weighted_total - weighted_below) / above
+        spread = below * above * (mean_below - mean_above) ** 2
+        if spread > best:
+            best, threshold = spread, level
+    return threshold
+
+
 class ImageHandler:
-    def extract_text(self, image_path):
-        if pytesseract is None:
-            return "OCR Library not installed on server."
+    NO_OCR = "OCR Library not installed on server."
+    NO_TESSERACT = "Tesseract Binary not found on server."
+
+    def __init__(self, engine=None):
+        # Shared, bounded pool of Tesseract workers (ocr.OCREngine)
+        if engine is None:
+            from ocr import OCREngine
+            engine = OCREngine()
+        self.engine = engine
+
+    def extract_text(self, image):
+        """OCR an image given as a file path or a binary file object (e.g. an upload in memory)."""
+        if self.engine.backend is None:
+            return self.NO_OCR
         try:
-            img = Image.open(image_path)
+            img = self.load(image)
             try:
-                text = pytesseract.image_to_string(img)
-                return text.strip()
+                return self.recognize(img)
             except Exception:
-                return "Tesseract Binary not found on server."
+                return self.NO_TESSERACT
         except Exception as e:
             return str(e)
+
+    def load(self, image):
+        """Open an image (path or binary file object), preprocessed for OCR."""
+        return self.preprocess(_import_ocr().open(image))
+
+    def regions(self, img):
+        """Boxes of the separate lines/problems in a preprocessed image, in reading order."""
+        from ocr import text_regions
+        return text_regions(img)
+
+    def recognize(self, img, box=None):
+        """Text in a preprocessed image, or in one line box of it; raises if Tesseract fails.
+
+        The whole image (box None or covering it all) may hold several lines
+        and is read as a block; a box from regions() is read as a single line.
+        """
+        from ocr import PSM_BLOCK, PSM_SINGLE_LINE
+        if box is None or tuple(box) == (0, 0, img.width, img.height):
+            return self.engine.image_to_string(img, psm=PSM_BLOCK).strip()
+        # Tesseract reads a line best with some white margin around it
+        pad = (box[3] - box[1]) // 2 + 4
+        img = img.crop((max(0, box[0] - pad), max(0, box[1] - pad),
+                        min(img.width, box[2] + pad), min(img.height, box[3] + pad)))
+        return self.engine.image_to_string(img, psm=PSM_SINGLE_LINE).strip()
+
+    def preprocess(self, img):
+        """Prepare an image of printed math for OCR: upright, grayscale, downscaled, black on white."""
+        Image = _import_ocr()
+        ImageOps = timed_import('PIL.ImageOps', 'ocr')
+        # JPEGs decode straight to a reduced, grayscale image
+        img.draft('L', (OCR_MAX_SIDE, OCR_MAX_SIDE))
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            # Transparent areas would otherwise turn black
+            img = img.convert('RGBA')
+            img = Image.alpha_composite(Image.new('RGBA', img.size, 'white'), img)
+        img = img.convert('L')
+        if max(img.size) > OCR_MAX_SIDE:
+            img.thumbnail((OCR_MAX_SIDE, OCR_MAX_SIDE), Image.Resampling.LANCZOS)
+
+        threshold = _otsu_threshold(img.histogram())
+        img = img.point([0] * (threshold + 1) + [255] * (255 - threshold))
+        # Tesseract expects dark text on a light background
+        if img.histogram()[0] > img.width * img.height / 2:
+            img = ImageOps.invert(img)
+        return img
@@ -0,0 +1,237 @@
+import atexit
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import time
+
+
+# Wall-clock deadline (seconds) per action type; actions not listed run inline
+DEFAULT_TIMEOUTS = {
+    'SOLVE': 10.0,
+    'DERIVE': 5.0,
+    'INTEGRATE': 15.0,
+    'PLOT_3D': 10.0,
+    'INTERCEPTS': 3.0,
+}
+
+
+class ComputationTimeout(Exception):
+    """Raised when a symbolic job exceeds the deadline for its action type."""
+
+    def __init__(self, action, timeout):
+        super().__init__(f"{action} timed out after {timeout:g}s")
+        self.action = action
+        self.timeout = timeout
+
+
+def _portable(error):
+    """error if it survives pickling, else a RuntimeError carrying its message."""
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def _worker_main(conn):
+    """Worker loop: import SymPy and build an engine once, then serve jobs until the pipe closes."""
+    import sympy  # noqa: F401  (pre-warm)
+    from calculator_logic import MathEngine
+
+    # The parent process owns caching; workers only compute
+    engine = MathEngine(intent_cache_size=0, result_cache_size=0)
+    while True:
+        try:
+            target, args = conn.recv()
+        except (EOFError, OSError):
+            break
+        try:
+            func = getattr(engine, target) if isinstance(target, str) else target
+            reply = (True, func(*args))
+        except Exception as e:
+            # An exception whose __init__ doesn't match its args can't be
+            # unpickled by the parent
+            reply = (False, _portable(e))
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Unpicklable result or exception
+            conn.send((False, RuntimeError(repr(e))))
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        self.process.terminate()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class SymbolicExecutor:
+    """Pool of pre-warmed worker processes for heavy SymPy jobs.
+
+    Each job gets a per-action wall-clock deadline; a worker that misses it is
+    killed and replaced so one pathological input cannot pin the server.
+
+    With start=False the workers are spawned on first use (or by start()), so
+    a preloading server can build the executor before forking and each forked
+    process gets its own workers.
+    """
+
+    def __init__(self, workers=2, timeouts=None, start_method=None, start=True):
+        methods = multiprocessing.get_all_start_methods()
+        if start_method is None:
+            # fork shares the already-imported SymPy pages with the workers
+            start_method = 'fork' if 'fork' in methods else 'spawn'
+        self._ctx = multiprocessing.get_context(start_method)
+        # Forking while other threads run can copy a lock one of them holds
+        # (caches, logging, imports) and deadlock the child; workers started
+        # then (replacements after a timeout, from a request thread) come from
+        # a forkserver with the engine preloaded instead
+        self._threaded_ctx = self._ctx
+        if start_method == 'fork' and 'forkserver' in methods:
+            self._threaded_ctx = multiprocessing.get_context('forkserver')
+            self._threaded_ctx.set_forkserver_preload(['calculator_logic'])
+        self.size = workers
+        self.timeouts = dict(DEFAULT_TIMEOUTS if timeouts is None else timeouts)
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+        atexit.register(self.shutdown)
+        if start:
+            self.start()
+
+    def _reset(self):
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._started = False
+        self._closed = False
+        self.completed = 0
+        self.timed_out = 0
+        self.restarts = 0
+
+    def _after_fork(self):
+        # Workers (and their pipes) belong to the parent; start fresh here
+        for worker in self._workers:
+            try:
+                worker.conn.close()
+            except OSError:
+                pass
+        self._reset()
+
+    def start(self):
+        """Spawn the worker processes if this process has not done so yet."""
+        with self._lock:
+            if self._started or self._closed:
+                return
+            self._started = True
+        for _ in range(self.size):
+            self._spawn()
+
+    def _spawn(self):
+        ctx = self._ctx if threading.active_count() == 1 else self._threaded_ctx
+        worker = _Worker(ctx)
+        with self._lock:
+            self._workers.append(worker)
+        self._idle.put(worker)
+
+    def _replace(self, worker):
+        worker.kill()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            self.restarts += 1
+            closed = self._closed
+        if not closed:
+            self._spawn()
+
+    def handles(self, action):
+        return action in self.timeouts
+
+    def run(self, action, target, *args):
+        """Run target(*args) in a worker (target may be a MathEngine method name).
+
+        Raises ComputationTimeout if the action's deadline passes, including
+        time spent waiting for a free worker.
+        """
+        timeout = self.timeouts[action]
+        deadline = time.monotonic() + timeout
+        if not self._started:
+            self.start()
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            with self._lock:
+                self.timed_out += 1
+            raise ComputationTimeout(action, timeout)
+
+        try:
+            worker.conn.send((target, args))
+        except (OSError, BrokenPipeError):
+            self._replace(worker)
+            raise RuntimeError(f"{action} worker exited unexpectedly")
+        except Exception:
+            # Arguments could not be pickled; the worker never saw the job
+            self._idle.put(worker)
+            raise
+
+        replied = False
+        try:
+            if not worker.conn.poll(max(0.0, deadline - time.monotonic())):
+                with self._lock:
+                    self.timed_out += 1
+                raise ComputationTimeout(action, timeout)
+            try:
+                ok, value = worker.conn.recv()
+            except (EOFError, OSError):
+                # Worker crashed mid-job
+                raise RuntimeError(f"{action} worker exited unexpectedly")
+            except Exception as e:
+                # The reply was read in full but couldn't be unpickled; the worker is fine
+                ok, value = False, RuntimeError(f"{action} failed: {e!r}")
+            replied = True
+        finally:
+            # Without a complete reply the worker's state is unknown: replace it
+            if replied:
+                self._idle.put(worker)
+            else:
+                self._replace(worker)
+
+        with self._lock:
+            self.completed += 1
+        if not ok:
+            raise value
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {
+                'started': self._started,
+                'workers': len(self._workers),
+                'idle': self._idle.qsize(),
+                'completed': self.completed,
+                'timed_out': self.timed_out,
+                'restarts': self.restarts,
+                'timeouts': dict(self.timeouts),
+            }
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.kill()
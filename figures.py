@@ -0,0 +1,89 @@
+import threading
+
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import mpl_toolkits.mplot3d  # noqa: F401  (registers the '3d' projection)
+
+
+def _style_2d(ax):
+    ax.spines['left'].set_position('zero')
+    ax.spines['bottom'].set_position('zero')
+    ax.spines['right'].set_color('none')
+    ax.spines['top'].set_color('none')
+    ax.xaxis.set_ticks_position('bottom')
+    ax.yaxis.set_ticks_position('left')
+    ax.tick_params(axis='both', which='major', labelsize=9)
+    ax.set_xlabel('x', loc='right', fontsize=11, fontweight='bold')
+    ax.set_ylabel('y', loc='top', fontsize=11, fontweight='bold', rotation=0)
+    ax.grid(True, linestyle='--', alpha=0.5, color='#cbd5e1')
+
+
+def _style_3d(ax):
+    ax.set_xlabel('x-axis', fontsize=11, fontweight='600', labelpad=8)
+    ax.set_ylabel('y-axis', fontsize=11, fontweight='600', labelpad=8)
+    ax.set_zlabel('z-axis', fontsize=11, fontweight='600', labelpad=8)
+    ax.tick_params(axis='both', which='major', labelsize=9, pad=3)
+
+
+class FigurePool:
+    """Per-thread, pre-styled 2D and 3D figures that are reused across plots.
+
+    Building a figure, its axes (especially 3D ones) and the axis styling is a
+    large fixed cost per graph. Each thread keeps one figure per kind; release()
+    removes what was drawn but keeps the axes and their styling. Figures use
+    the object-oriented API with their own Agg canvas, never pyplot's global
+    state, so threads can render at the same time.
+    """
+
+    def __init__(self, figsize=(7, 5)):
+        self.figsize = figsize
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, is_3d=False):
+        """This thread's (fig, ax) for a 2D or 3D plot, ready to draw on."""
+        figures = self._local.__dict__.setdefault('figures', {})
+        entry = figures.get(bool(is_3d))
+        with self._lock:
+            if entry is None:
+                self.created += 1
+            else:
+                self.reused += 1
+        if entry is None:
+            fig = Figure(figsize=self.figsize)
+            FigureCanvasAgg(fig)
+            if is_3d:
+                ax = fig.add_subplot(111, projection='3d')
+                _style_3d(ax)
+            else:
+                ax = fig.add_subplot(111)
+                _style_2d(ax)
+            entry = figures[bool(is_3d)] = (fig, ax)
+        return entry
+
+    def release(self, ax):
+        """Remove everything drawn on ax and reset its title, limits and layout."""
+        for artist in list(ax.lines) + list(ax.collections) + list(ax.texts) + list(ax.patches) + list(ax.images):
+            # Removing a ContourSet also removes its clabel texts
+            if artist.axes is None:
+                continue
+            try:
+                artist.remove()
+            except (ValueError, NotImplementedError):
+                pass
+        ax.set_title('')
+        ax.relim()
+        ax.autoscale(enable=True)
+        if hasattr(ax, 'set_autoscalez_on'):
+            ax.set_autoscalez_on(True)
+        # tight_layout starts from the current margins; restore the defaults so
+        # a reused figure renders exactly like a new one
+        ax.figure.subplots_adjust(**{side: matplotlib.rcParams[f'figure.subplot.{side}']
+                                     for side in ('left', 'right', 'bottom', 'top')})
+
+    def stats(self):
+        with self._lock:
+            return {'created': self.created, 'reused': self.reused}
@@ -0,0 +1,18 @@
+# Gunicorn settings for long-running deployments (gunicorn -c gunicorn.conf.py app:app)
+import os
+
+# Warm up in the master before forking so workers share the primed pages copy-on-write
+preload_app = True
+os.environ.setdefault('CALC_WARMUP', '1')
+
+bind = os.environ.get('BIND', '0.0.0.0:' + os.environ.get('PORT', '8000'))
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = 120
+
+
+def post_fork(server, worker):
+    # Each worker gets its own SymPy process pool, forked from the warmed worker
+    import app
+    app.start_workers()
@@ -0,0 +1,82 @@
+import importlib
+import sys
+import threading
+import time
+
+
+_lock = threading.RLock()
+# {name, seconds, capability} for every import/setup step, in load order
+IMPORT_LOG = []
+
+
+def record(name, seconds, capability=None):
+    with _lock:
+        IMPORT_LOG.append({'name': name, 'seconds': round(seconds, 4), 'capability': capability})
+
+
+def timed_import(name, capability=None):
+    """Import a module, logging how long it took if this was its first import."""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    record(name, time.perf_counter() - start, capability)
+    return module
+
+
+class LazyObject:
+    """Proxy that builds its target with factory() on first attribute access.
+
+    Used for heavy modules and services so a cold start only pays for the
+    capabilities a request actually needs.
+    """
+
+    def __init__(self, capability, factory, timed=True):
+        self._capability = capability
+        self._factory = factory
+        self._timed = timed
+        self._target = None
+        self._loaded = False
+
+    def lazy_load(self):
+        if not self._loaded:
+            with _lock:
+                if not self._loaded:
+                    start = time.perf_counter()
+                    self._target = self._factory()
+                    self._loaded = True
+                    if self._timed:
+                        record(f"[{self._capability}]", time.perf_counter() - start, self._capability)
+        return self._target
+
+    @property
+    def lazy_loaded(self):
+        return self._loaded
+
+    def __getattr__(self, name):
+        return getattr(self.lazy_load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.lazy_load()(*args, **kwargs)
+
+    def __bool__(self):
+        return bool(self.lazy_load())
+
+    def __repr__(self):
+        state = 'loaded' if self._loaded else 'not loaded'
+        return f"<LazyObject {self._capability} ({state})>"
+
+
+def lazy_module(name, capability=None):
+    # timed_import already logs the module itself
+    return LazyObject(capability or name, lambda: timed_import(name, capability or name), timed=False)
+
+
+def import_report(capabilities=()):
+    """What was imported, how long each step took, and which capabilities are loaded."""
+    with _lock:
+        steps = list(IMPORT_LOG)
+    return {
+        'imports': steps,
+        'loaded': {lazy._capability: lazy.lazy_loaded for lazy in capabilities},
+    }
@@ -0,0 +1,208 @@
+import os
+import queue
+import threading
+import time
+
+from lazy import timed_import
+
+
+# Characters printed math and commands are made of: digits, operators and
+# every letter, since keywords, function names and units ("minus",
+# "matrix", "km", "mph") use most of the alphabet; anything else is noise here
+MATH_WHITELIST = ("0123456789+-*/=()[].,^%°abcdefghijklmnopqrstuvwxyz"
+                  "ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+# Tesseract page segmentation modes
+PSM_BLOCK = 6
+PSM_SINGLE_LINE = 7
+
+
+_INVERT = [255 - level for level in range(256)]
+
+
+def text_lines(img, min_height=4):
+    """Boxes (left, top, right, bottom) of the text lines in a black-on-white image, top to bottom.
+
+    Rows with any ink belong to a line; runs shorter than min_height pixels
+    are specks, not text.
+    """
+    ink = img.convert('L').point(_INVERT)
+    box = ink.getbbox()
+    if box is None:
+        return []
+    from PIL import Image
+
+    rows = ink.resize((1, ink.height), Image.Resampling.BOX).tobytes() + b'\0'
+    lines, top = [], None
+    for y, level in enumerate(rows):
+        if level and top is None:
+            top = y
+        elif not level and top is not None:
+            if y - top >= min_height:
+                lines.append((box[0], top, box[2], y))
+            top = None
+    return lines
+
+
+def text_regions(img, gap=2.0):
+    """Boxes of the separate problems in a black-on-white image, in reading order.
+
+    Each text line is one region unless it has horizontal gaps wider than
+    gap times the line height (problems side by side in columns), in which
+    case it is split there.
+    """
+    from PIL import Image
+
+    ink = img.convert('L').point(_INVERT)
+    regions = []
+    for left, top, right, bottom in text_lines(img):
+        columns = ink.crop((left, top, right, bottom)).resize((right - left, 1), Image.Resampling.BOX).tobytes()
+        min_gap = gap * (bottom - top)
+        start = end = None
+        for x, level in enumerate(columns):
+            if not level:
+                continue
+            if start is not None and x - end > min_gap:
+                regions.append((left + start, top, left + end, bottom))
+                start = None
+            if start is None:
+                start = x
+            end = x + 1
+        if start is not None:
+            regions.append((left + start, top, left + end, bottom))
+    return regions
+
+def perceptual_hash(img, rows=2, cols=24):
+    """Fingerprint of a black-on-white image: per text line, its ink density on a rows x cols grid.
+
+    Each line is cropped to its ink and shrunk to the grid, and densities are
+    scaled so the line's mean is 64. Recompression, brightness, margins and
+    slight rotation barely move the cells; a changed digit moves some by a
+    lot. Returns a tuple with one bytes object per line.
+    """
+    from PIL import Image
+
+    ink = img.convert('L').point(_INVERT)
+    cells = []
+    for box in text_lines(img):
+        line = ink.crop(box)
+        line = line.crop(line.getbbox())
+        density = line.resize((cols, rows), Image.Resampling.BOX).tobytes()
+        mean = sum(density) / len(density) or 1
+        cells.append(bytes(min(255, round(level * 64 / mean)) for level in density))
+    return tuple(cells)
+
+
+def hash_distance(a, b):
+    """Largest cell difference between two perceptual hashes, in multiples of the mean line density.
+
+    Images with a different number of text lines are infinitely far apart.
+    """
+    if len(a) != len(b):
+        return float('inf')
+    return max((abs(x - y) for line_a, line_b in zip(a, b) for x, y in zip(line_a, line_b)), default=0) / 64
+
+
+class OCREngine:
+    """Bounded pool of Tesseract workers shared by all requests.
+
+    With tesserocr installed each worker is a long-lived in-process
+    TessBaseAPI that keeps its language data loaded between images and
+    releases the GIL while recognising. Otherwise each call runs the tesseract
+    binary through pytesseract. Either way at most `workers` images are
+    recognised at once; further callers queue for a free worker instead of
+    oversubscribing the CPU.
+    """
+
+    def __init__(self, workers=None, lang='eng', psm=PSM_BLOCK, whitelist=MATH_WHITELIST, timeout=10):
+        self.workers = workers or os.cpu_count() or 1
+        self.lang = lang
+        self.psm = psm
+        self.whitelist = whitelist
+        self.timeout = timeout  # pytesseract only; an in-process call cannot be interrupted
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.apis = 0
+        self.calls = 0
+        self.errors = 0
+        self.waiting = 0
+        self.busy = 0
+        self.wait_seconds = 0.0
+        self.ocr_seconds = 0.0
+        self.max_ocr_seconds = 0.0
+
+        self.backend = None
+        self._module = None
+        for backend in ('tesserocr', 'pytesseract'):
+            try:
+                self._module = timed_import(backend, 'ocr')
+                self.backend = backend
+                break
+            except ImportError:
+                continue
+
+    def image_to_string(self, img, psm=None):
+        """Recognise the text in a PIL image, waiting for a free worker first."""
+        queued = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+        with self._slots:
+            start = time.perf_counter()
+            with self._lock:
+                self.waiting -= 1
+                self.busy += 1
+            ok = False
+            try:
+                text = self._recognise(img, self.psm if psm is None else psm)
+                ok = True
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.busy -= 1
+                    self.calls += 1
+                    self.errors += 0 if ok else 1
+                    self.wait_seconds += start - queued
+                    self.ocr_seconds += elapsed
+                    self.max_ocr_seconds = max(self.max_ocr_seconds, elapsed)
+        return text
+
+    def _recognise(self, img, psm):
+        if self.backend == 'pytesseract':
+            config = f"--psm {psm} -c tessedit_char_whitelist={self.whitelist}"
+            return self._module.image_to_string(img, lang=self.lang, config=config, timeout=self.timeout)
+        try:
+            api = self._idle.get_nowait()
+        except queue.Empty:
+            api = self._module.PyTessBaseAPI(lang=self.lang)
+            api.SetVariable('tessedit_char_whitelist', self.whitelist)
+            with self._lock:
+                self.apis += 1
+        try:
+            api.SetPageSegMode(psm)
+            api.SetImage(img)
+            text = api.GetUTF8Text()
+        except Exception:
+            # Don't hand a worker in an unknown state to the next caller
+            api.End()
+            with self._lock:
+                self.apis -= 1
+            raise
+        self._idle.put(api)
+        return text
+
+    def stats(self):
+        with self._lock:
+            calls = self.calls or 1
+            return {
+                'backend': self.backend,
+                'workers': self.workers,
+                'loaded_apis': self.apis,
+                'busy': self.busy,
+                'waiting': self.waiting,
+                'calls': self.calls,
+                'errors': self.errors,
+                'avg_wait_ms': round(self.wait_seconds / calls * 1000, 2),
+                'avg_ocr_ms': round(self.ocr_seconds / calls * 1000, 2),
+                'max_ocr_ms': round(self.max_ocr_seconds * 1000, 2),
+            }
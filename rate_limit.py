@@ -0,0 +1,128 @@
+import abc
+import os
+import sqlite3
+import threading
+import time
+
+
+def _slide(window, current, previous, now, window_seconds):
+    """Advance a sliding-window counter to now; returns (window, current, previous, estimate).
+
+    The estimate weights the previous fixed window by how much of it still
+    overlaps the sliding window, so each check is O(1) instead of keeping a
+    timestamp per request.
+    """
+    now_window = int(now // window_seconds)
+    if now_window != window:
+        previous = current if now_window == window + 1 else 0
+        current = 0
+        window = now_window
+    elapsed = (now - window * window_seconds) / window_seconds
+    estimate = previous * (1.0 - elapsed) + current
+    return window, current, previous, estimate
+
+
+class RateLimiter(abc.ABC):
+    """Per-client rate limiter interface: allow `max_requests` per sliding `window_seconds`."""
+
+    def __init__(self, max_requests=30, window_seconds=60, clock=time.time):
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.clock = clock
+
+    @abc.abstractmethod
+    def allow(self, client_id, cost=1):
+        """Record a request worth `cost` requests from client_id; returns True if within the limit."""
+
+
+class MemoryRateLimiter(RateLimiter):
+    """In-process limiter with lock-striped per-client state and idle-client eviction."""
+
+    def __init__(self, max_requests=30, window_seconds=60, stripes=16, clock=time.time):
+        super().__init__(max_requests, window_seconds, clock)
+        self._stripes = [({}, threading.Lock()) for _ in range(stripes)]
+        self._last_sweep = [clock()] * stripes
+
+    def allow(self, client_id, cost=1):
+        now = self.clock()
+        index = hash(client_id) % len(self._stripes)
+        clients, lock = self._stripes[index]
+        with lock:
+            if now - self._last_sweep[index] >= self.window_seconds:
+                self._sweep(clients, now)
+                self._last_sweep[index] = now
+            window, current, previous, estimate = _slide(
+                *clients.get(client_id, (0, 0, 0))[:3], now, self.window_seconds)
+            if estimate + cost - 1 >= self.max_requests:
+                clients[client_id] = (window, current, previous, now)
+                return False
+            clients[client_id] = (window, current + cost, previous, now)
+            return True
+
+    def _sweep(self, clients, now):
+        # A client idle for two windows has no requests left to count
+        idle = [cid for cid, state in clients.items() if now - state[3] >= 2 * self.window_seconds]
+        for cid in idle:
+            del clients[cid]
+
+    def __len__(self):
+        return sum(len(clients) for clients, _ in self._stripes)
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """Limiter whose state lives in a local SQLite file shared by all worker processes."""
+
+    def __init__(self, path, max_requests=30, window_seconds=60, clock=time.time):
+        super().__init__(max_requests, window_seconds, clock)
+        self.path = path
+        self._lock = threading.Lock()
+        self._last_sweep = clock()
+        self._pid = None
+        self._inherited = []
+
+    @property
+    def _conn(self):
+        """This process's connection, opened on first use; caller holds the lock.
+
+        Connections must not cross fork(): a forked worker opens its own and
+        keeps the inherited one unused (see caching.SQLiteStore).
+        """
+        if self._pid != os.getpid():
+            if self._pid is not None:
+                self._inherited.append(self._connection)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+            except sqlite3.Error:
+                pass
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limit (client TEXT PRIMARY KEY, window INTEGER NOT NULL, '
+                'current INTEGER NOT NULL, previous INTEGER NOT NULL, last REAL NOT NULL)')
+            self._connection, self._pid = conn, os.getpid()
+        return self._connection
+
+    def allow(self, client_id, cost=1):
+        now = self.clock()
+        try:
+            with self._lock:
+                self._conn.execute('BEGIN IMMEDIATE')
+                try:
+                    if now - self._last_sweep >= self.window_seconds:
+                        self._conn.execute('DELETE FROM rate_limit WHERE last < ?',
+                                           (now - 2 * self.window_seconds,))
+                        self._last_sweep = now
+                    row = self._conn.execute('SELECT window, current, previous FROM rate_limit WHERE client = ?',
+                                             (str(client_id),)).fetchone()
+                    window, current, previous, estimate = _slide(*(row or (0, 0, 0)), now, self.window_seconds)
+                    allowed = estimate + cost - 1 < self.max_requests
+                    if allowed:
+                        current += cost
+                    self._conn.execute('INSERT OR REPLACE INTO rate_limit VALUES (?, ?, ?, ?, ?)',
+                                       (str(client_id), window, current, previous, now))
+                    self._conn.execute('COMMIT')
+                except Exception:
+                    self._conn.execute('ROLLBACK')
+                    raise
+            return allowed
+        except sqlite3.Error:
+            return True  # Fail open rather than lock everyone out
@@ -0,0 +1,368 @@
+import itertools
+import time
+
+import numpy as np
+
+
+def _evaluate(func, x):
+    """func over x as a float array; complex and invalid values become NaN."""
+    with np.errstate(all='ignore'):
+        y = np.asarray(func(x))
+    if y.ndim == 0:
+        y = np.full(x.shape, y)
+    if np.iscomplexobj(y) or y.dtype == object:
+        y = np.array(y, dtype=complex)
+        y = np.where(np.abs(y.imag) > 1e-12, np.nan, y.real)
+    return np.asarray(y, dtype=float)
+
+
+def adaptive_sample(func, a, b, initial=49, budget=2000, max_depth=12, tol=2e-3):
+    """Sample y = func(x) on [a, b], adding points only where the curve needs them.
+
+    Starts from a coarse uniform grid and repeatedly evaluates the midpoint of
+    each interval that is still being refined. An interval is split again if
+    its midpoint is off the straight line between its ends by more than
+    tol * (vertical scale), or if it straddles the edge of the domain. Where an
+    interval stays unresolved down to max_depth with a large jump (a pole like
+    tan x or 1/x, or a step), a NaN is inserted so the plotted line breaks.
+
+    Returns (x, y, ylim): ylim is a suggested y-range when poles were found, so
+    near-infinite samples don't flatten the rest of the curve, otherwise None.
+    """
+    x = np.linspace(a, b, initial)
+    y = _evaluate(func, x)
+    evaluations = initial
+
+    finite = y[np.isfinite(y)]
+    if finite.size:
+        low, high = np.percentile(finite, [10, 90])
+        scale = max(high - low, 1e-12 * max(1.0, abs(high)))
+    else:
+        low = high = 0.0
+        scale = 1.0
+
+    # Left ends of the intervals still being refined (indices into x)
+    candidates = np.arange(len(x) - 1)
+    unresolved = np.array([], dtype=int)
+    for depth in range(max_depth):
+        if candidates.size == 0:
+            break
+        remaining = budget - evaluations
+        if remaining <= 0:
+            unresolved = candidates
+            break
+
+        x0, x1 = x[candidates], x[candidates + 1]
+        y0, y1 = y[candidates], y[candidates + 1]
+        if candidates.size > remaining:
+            # Spend what's left of the budget on the steepest intervals
+            steepest = np.argsort(-np.nan_to_num(np.abs(y1 - y0), nan=np.inf))[:remaining]
+            candidates, x0, x1, y0, y1 = (arr[steepest] for arr in (candidates, x0, x1, y0, y1))
+        xm = (x0 + x1) / 2
+        ym = _evaluate(func, xm)
+        evaluations += xm.size
+
+        with np.errstate(invalid='ignore'):
+            error = np.abs(ym - (y0 + y1) / 2)
+        ends = np.isfinite(y0).astype(int) + np.isfinite(y1) + np.isfinite(ym)
+        split = np.where(ends == 3, error > tol * scale, (ends > 0) & (ends < 3))
+
+        # Insert the new midpoints; the two halves of each split interval are refined next
+        order = np.argsort(np.concatenate([x, xm]), kind='stable')
+        position = np.empty(order.size, dtype=int)
+        position[order] = np.arange(order.size)
+        x = np.concatenate([x, xm])[order]
+        y = np.concatenate([y, ym])[order]
+        mid = position[len(position) - xm.size:][split]
+        candidates = np.sort(np.concatenate([mid - 1, mid]))
+    else:
+        unresolved = candidates
+
+    breaks = []
+    if unresolved.size:
+        # Steep but continuous stretches also reach max_depth; a real break is a
+        # jump against the direction of its neighbours (tan x, 1/x) or one far
+        # larger than theirs (a step)
+        dy = np.diff(y)
+        left = np.abs(dy[np.maximum(unresolved - 1, 0)])
+        right = np.abs(dy[np.minimum(unresolved + 1, dy.size - 1)])
+        step = dy[unresolved]
+        with np.errstate(invalid='ignore'):
+            against = ((np.sign(step) != np.sign(dy[np.maximum(unresolved - 1, 0)]))
+                       & (np.sign(step) != np.sign(dy[np.minimum(unresolved + 1, dy.size - 1)])))
+            is_break = (np.abs(step) > 0.02 * scale) & (against | (np.abs(step) > 10 * np.maximum(left, right)))
+        breaks = unresolved[np.isfinite(step) & is_break]
+    ylim = None
+    if len(breaks) or np.isinf(y).any():
+        if len(breaks):
+            x = np.insert(x, breaks + 1, (x[breaks] + x[breaks + 1]) / 2)
+            y = np.insert(y, breaks + 1, np.nan)
+        finite = y[np.isfinite(y)]
+        if finite.size and (finite.max() > high + 50 * scale or finite.min() < low - 50 * scale):
+            ylim = (float(max(finite.min(), low - 2 * scale)), float(min(finite.max(), high + 2 * scale)))
+    return x, y, ylim
+
+
+def find_roots(func, windows=(12, 120, 1200), samples=2001, iterations=52, budget=0.25, nearest=True):
+    """Real roots of a 1D function, for picking plot bounds.
+
+    Scans [-w, w] for each window in turn on a uniform grid (0 included) and
+    stops at the first window that has roots: exact zeros on the grid, plus
+    every sign change between finite neighbours, polished by bisecting all
+    brackets at once. Sign changes across a pole (tan x, 1/x) are dropped
+    because the function does not shrink there. Windows are skipped once
+    budget seconds have passed.
+
+    With nearest=True returns only the roots nearest the origin, as
+    sympy.solve's principal solutions gave for plot bounds: 0 if it is a
+    root, and the closest root on each side of it (sin x -> [0, -pi, pi],
+    not every period in view). Pass nearest=False to keep them all.
+    """
+    start = time.perf_counter()
+    roots = np.empty(0)
+    for window in windows:
+        if time.perf_counter() - start > budget:
+            break
+        x = np.linspace(-window, window, samples)
+        y = _evaluate(func, x)
+        bracket = np.nonzero(np.isfinite(y[:-1]) & np.isfinite(y[1:]) & (np.sign(y[:-1]) * np.sign(y[1:]) < 0))[0]
+        lo, hi, f_lo = x[bracket], x[bracket + 1], y[bracket]
+        for _ in range(iterations):
+            mid = (lo + hi) / 2
+            f_mid = _evaluate(func, mid)
+            left = np.sign(f_mid) == np.sign(f_lo)
+            lo, f_lo = np.where(left, mid, lo), np.where(left, f_mid, f_lo)
+            hi = np.where(left, hi, mid)
+        mid = (lo + hi) / 2
+        residual = np.abs(_evaluate(func, mid))
+        polished = mid[residual <= 1e-6 * (np.abs(y[bracket]) + np.abs(y[bracket + 1]))]
+        roots = np.concatenate([x[y == 0], polished])
+        if roots.size:
+            break
+    # Clean up bisection noise such as 1e-17 for a root at 0
+    roots = np.round(roots, 10) + 0.0
+    if nearest:
+        roots = np.concatenate([roots[roots == 0][:1], np.sort(roots[roots < 0])[-1:],
+                                np.sort(roots[roots > 0])[:1]])
+    return sorted(roots.tolist(), key=abs)
+
+
+def _evaluate_field(func, coords):
+    """func over coordinate arrays as floats; complex and invalid values become NaN."""
+    with np.errstate(all='ignore'):
+        v = np.asarray(func(*coords))
+    if np.iscomplexobj(v) or v.dtype == object:
+        v = np.array(v, dtype=complex)
+        v = np.where(np.abs(v.imag) > 1e-12, np.nan, v.real)
+    return np.broadcast_to(np.asarray(v, dtype=float), coords[0].shape)
+
+
+def _refine_cells(func, lows, highs, coarse, levels, max_cells=None):
+    """Adaptive lattice shared by the curve and surface tracers.
+
+    Evaluates a coarse grid, then repeatedly halves (in every dimension) only
+    the cells whose corners change sign, so the cost follows the size of the
+    zero set rather than the plot volume. The finest lattice has
+    coarse * 2**levels cells per side. With max_cells, refinement stops early
+    rather than exceed roughly that many cells, so large surfaces stay cheap
+    to draw.
+
+    Returns (values, cells, step, spacing, evaluations): the lattice of
+    function values (NaN where not evaluated), the lower-corner indices of the
+    cells the zero set passes through, their width in lattice steps, the
+    lattice spacing per axis, and the number of evaluations.
+    """
+    ndim = len(lows)
+    size = coarse * 2 ** levels
+    lows = np.asarray(lows, dtype=float)
+    spacing = (np.asarray(highs, dtype=float) - lows) / size
+    values = np.full((size + 1,) * ndim, np.nan)
+    evaluated = np.zeros(values.shape, dtype=bool)
+    offsets = np.array(list(itertools.product((0, 1), repeat=ndim)))
+
+    def evaluate(points):
+        points = points[~evaluated[tuple(points.T)]]
+        if len(points):
+            flat = np.unique(np.ravel_multi_index(tuple(points.T), values.shape))
+            index = np.unravel_index(flat, values.shape)
+            values[index] = _evaluate_field(func, [lows[k] + index[k] * spacing[k] for k in range(ndim)])
+            evaluated[index] = True
+
+    def sign_changes(cells, step):
+        signs = np.array([values[tuple((cells + offset * step).T)] for offset in offsets])
+        with np.errstate(invalid='ignore'):
+            positive = signs > 0
+        finite = np.isfinite(signs).all(axis=0)
+        return finite & positive.any(axis=0) & ~positive.all(axis=0)
+
+    step = 2 ** levels
+    axis = np.arange(0, size + 1, step)
+    lattice = np.stack(np.meshgrid(*[axis] * ndim, indexing='ij'), axis=-1).reshape(-1, ndim)
+    evaluate(lattice)
+    cells = lattice[(lattice < size).all(axis=1)]
+    cells = cells[sign_changes(cells, step)]
+
+    while step > 1 and cells.size:
+        # Halving every side of a surface's cells gives ~2**(ndim - 1) times as many
+        if max_cells and len(cells) * 2 ** (ndim - 1) > max_cells:
+            break
+        step //= 2
+        cells = np.concatenate([cells + offset * step for offset in offsets])
+        evaluate(np.concatenate([cells + offset * step for offset in offsets]))
+        cells = cells[sign_changes(cells, step)]
+    return values, cells, step, spacing, int(evaluated.sum())
+
+
+# Marching squares: the edge pairs joined in a cell, by corner case (bit 1:
+# bottom-left, 2: bottom-right, 4: top-right, 8: top-left corner positive).
+# Edges: 0 bottom, 1 right, 2 top, 3 left; -1 pads to two segments. Saddles
+# (5, 10) have a second table for when the cell centre is positive.
+_MARCHING_SQUARES = np.full((2, 16, 2, 2), -1)
+for _case, _pairs in {1: [(3, 0)], 2: [(0, 1)], 3: [(3, 1)], 4: [(1, 2)], 5: [(3, 0), (1, 2)],
+                      6: [(0, 2)], 7: [(3, 2)], 8: [(2, 3)], 9: [(0, 2)], 10: [(0, 1), (2, 3)],
+                      11: [(1, 2)], 12: [(1, 3)], 13: [(0, 1)], 14: [(3, 0)]}.items():
+    _MARCHING_SQUARES[:, _case, :len(_pairs)] = _pairs
+_MARCHING_SQUARES[1, 5] = [(0, 1), (3, 2)]
+_MARCHING_SQUARES[1, 10] = [(3, 0), (1, 2)]
+
+
+def trace_implicit(func, x_range, y_range, coarse=64, levels=3):
+    """Trace the curve func(x, y) = 0 as polylines.
+
+    Only cells the curve passes through are refined (see _refine_cells), so
+    evaluation cost follows the curve's length rather than the plot area.
+    Marching squares on the finest cells gives segments, which are chained
+    into polylines.
+
+    Returns (polylines, evaluations): a list of (n, 2) arrays of points, and how
+    many times func was evaluated.
+    """
+    size = coarse * 2 ** levels
+    x0, y0 = float(x_range[0]), float(y_range[0])
+    values, cells, _, (dx, dy), evaluations = _refine_cells(
+        func, (x_range[0], y_range[0]), (x_range[1], y_range[1]), coarse, levels)
+
+    # Each crossing is keyed by the lattice edge it lies on (2 * point index,
+    # +1 for vertical edges), so neighbouring cells agree on shared points and
+    # segments can be chained
+    i, j = cells[:, 0], cells[:, 1]
+    v = np.array([values[i, j], values[i + 1, j], values[i + 1, j + 1], values[i, j + 1]])
+    case = ((v > 0) * np.array([[1], [2], [4], [8]])).sum(axis=0)
+    pairs = _MARCHING_SQUARES[(v.mean(axis=0) > 0).astype(int), case]
+    edge_keys = np.array([2 * (i * (size + 1) + j), 2 * ((i + 1) * (size + 1) + j) + 1,
+                          2 * (i * (size + 1) + j + 1), 2 * (i * (size + 1) + j) + 1])
+    # Crossing position along each edge, and the point it gives
+    with np.errstate(all='ignore'):
+        bottom, right = v[0] / (v[0] - v[1]), v[1] / (v[1] - v[2])
+        top, left = v[3] / (v[3] - v[2]), v[0] / (v[0] - v[3])
+    px = x0 + dx * np.array([i + bottom, i + 1.0, i + top, i + 0.0])
+    py = y0 + dy * np.array([j + 0.0, j + right, j + 1.0, j + left])
+
+    points = {}
+    links = {}
+    rows = np.arange(len(cells))
+    for segment in range(2):
+        a, b = pairs[:, segment, 0], pairs[:, segment, 1]
+        valid = a >= 0
+        a, b, idx = a[valid], b[valid], rows[valid]
+        for edge in (a, b):
+            points.update(zip(edge_keys[edge, idx].tolist(), zip(px[edge, idx].tolist(), py[edge, idx].tolist())))
+        for ka, kb in zip(edge_keys[a, idx].tolist(), edge_keys[b, idx].tolist()):
+            links.setdefault(ka, []).append(kb)
+            links.setdefault(kb, []).append(ka)
+
+    polylines = []
+    # Open chains start at an end with one neighbour; whatever is left are loops
+    starts = [key for key, nbrs in links.items() if len(nbrs) == 1] + list(links)
+    for start in starts:
+        if not links.get(start):
+            continue
+        chain = [start]
+        current = start
+        while links.get(current):
+            nxt = links[current].pop()
+            links[nxt].remove(current)
+            chain.append(nxt)
+            current = nxt
+        polylines.append(np.array([points[key] for key in chain]))
+    return polylines, evaluations
+
+
+# Marching tetrahedra: each cube (corners numbered bottom face 0-3, top 4-7,
+# counter-clockwise) is split into six tetrahedra around the 0-6 diagonal.
+# Unlike marching cubes this needs no 256-case table and has no ambiguous cases.
+_CUBE_CORNERS = np.array([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0),
+                          (0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)])
+_TETRAHEDRA = np.array([(0, 5, 1, 6), (0, 1, 2, 6), (0, 2, 3, 6),
+                        (0, 3, 7, 6), (0, 7, 4, 6), (0, 4, 5, 6)])
+
+
+def isosurface(func, x_range, y_range, z_range, coarse=16, levels=3, max_cells=4000):
+    """Triangulate the surface func(x, y, z) = 0 numerically.
+
+    Only cells the surface passes through are refined (see _refine_cells),
+    up to about max_cells of them; marching tetrahedra on those cells gives triangles whose vertices
+    are shared along lattice edges, all facing the positive side of func.
+
+    Returns (vertices, triangles, evaluations): an (n, 3) array of points, an
+    (m, 3) array of vertex indices, and how many times func was evaluated.
+    """
+    lows = (x_range[0], y_range[0], z_range[0])
+    values, cells, step, spacing, evaluations = _refine_cells(
+        func, lows, (x_range[1], y_range[1], z_range[1]), coarse, levels, max_cells)
+    if not cells.size:
+        return np.empty((0, 3)), np.empty((0, 3), dtype=int), evaluations
+
+    # Lattice points of every tetrahedron's corners: (cells * 6, 4, 3)
+    corners = cells[:, None, None, :] + _CUBE_CORNERS[_TETRAHEDRA][None] * step
+    corners = corners.reshape(-1, 4, 3)
+    v = values[corners[..., 0], corners[..., 1], corners[..., 2]]
+    positive = v > 0
+    count = positive.sum(axis=1)
+
+    # Each triangle is three lattice edges (pairs of corner slots) plus the
+    # slot of a positive corner, used to orient it
+    triangles = []
+    rows = np.arange(len(corners))
+    for flip, lone_count in ((False, 1), (True, 3)):
+        # One corner on its own side: a single triangle around it
+        sel = rows[count == lone_count]
+        lone = np.argmax(positive[sel] != flip, axis=1)
+        others = np.argsort(positive[sel] != flip, axis=1, kind='stable')[:, :3]
+        edges = np.stack([np.stack([lone, others[:, k]], axis=1) for k in range(3)], axis=1)
+        inside = lone if not flip else others[:, 0]
+        triangles.append((sel, edges, inside))
+    # Two corners each side: a quad, split into two triangles
+    sel = rows[count == 2]
+    order = np.argsort(~positive[sel], axis=1, kind='stable')
+    a, b, c, d = order.T
+    for quad in (((a, c), (a, d), (b, d)), ((a, c), (b, d), (b, c))):
+        edges = np.stack([np.stack(pair, axis=1) for pair in quad], axis=1)
+        triangles.append((sel, edges, a))
+
+    sel = np.concatenate([t[0] for t in triangles])
+    edges = np.concatenate([t[1] for t in triangles])           # (m, 3, 2) corner slots
+    inside = np.concatenate([t[2] for t in triangles])
+
+    # Interpolated crossing on each edge, keyed by its two lattice points so
+    # neighbouring tetrahedra share vertices
+    ends = corners[sel[:, None, None], edges]                    # (m, 3, 2, 3)
+    ids = np.ravel_multi_index(tuple(np.moveaxis(ends, -1, 0)), values.shape)
+    keys = np.sort(ids, axis=-1)
+    keys = keys[..., 0] * values.size + keys[..., 1]
+    va = values[tuple(np.moveaxis(ends[:, :, 0], -1, 0))]
+    vb = values[tuple(np.moveaxis(ends[:, :, 1], -1, 0))]
+    t = va / (va - vb)
+    points = ends[:, :, 0] + t[..., None] * (ends[:, :, 1] - ends[:, :, 0])
+
+    unique, first, faces = np.unique(keys.ravel(), return_index=True, return_inverse=True)
+    vertices = np.asarray(lows, dtype=float) + points.reshape(-1, 3)[first] * spacing
+    faces = faces.reshape(-1, 3)
+
+    # Face every triangle towards the positive side
+    tri = vertices[faces]
+    normal = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    toward = (np.asarray(lows) + corners[sel, inside] * spacing) - tri.mean(axis=1)
+    backwards = (normal * toward).sum(axis=1) < 0
+    faces[backwards] = faces[backwards][:, ::-1]
+    return vertices, faces, evaluations
@@ -140,7 +140,8 @@ if (synth.onvoiceschanged !== undefined) {
     synth.onvoiceschanged = loadVoices;
 }
 
-function speak(text) {
+// queue=true lets streamed results be spoken one after another
+function speak(text, queue = false) {
     if (!text) return;
     // Strip LaTeX markers for speech
     text = text.replace(/\$\$/g, '').replace(/\$/g, '');
@@ -149,7 +150,7 @@ function speak(text) {
     text = text.replace(/\\,/g, ' ');
     text = text.replace(/\\/g, '');
     
-    synth.cancel();
+    if (!queue) synth.cancel();
     const utterance = new SpeechSynthesisUtterance(text);
     utterance.rate = 1.1;
     utterance.pitch = 1.0;
@@ -392,11 +393,16 @@ async function sendToBackend(text) {
         const response = await fetch('/process_command', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ text: processedText, lang: langSelect.value })
+            body: JSON.stringify({ text: processedText, lang: langSelect.value, stream: true, graph_format: 'data' })
         });
-        const data = await response.json();
-        hideLoader();
-        handleResponse(data);
+        const type = response.headers.get('Content-Type') || '';
+        if (type.includes('application/x-ndjson') && response.body) {
+            await readStream(response);
+        } else {
+            const data = await response.json();
+            hideLoader();
+            handleResponse(data);
+        }
     } catch (error) {
         hideLoader();
         addMessage("Error connecting to server.", 'bot');
@@ -404,6 +410,40 @@ async function sendToBackend(text) {
     }
 }
 
+// Streamed replies: one JSON event per line (intent, result, graph, done)
+async function readStream(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let spoken = false;
+
+    const handleEvent = (event) => {
+        if (event.event === 'intent') {
+            const action = event.intent?.action || 'command';
+            statusBar.textContent = `Working on ${action.toLowerCase().replace('_', ' ')}...`;
+        } else if (event.event === 'result') {
+            hideLoader();
+            handleResponse(event, spoken);
+            spoken = true;
+        } else if (event.event === 'graph') {
+            handleResponse(event);
+        } else if (event.event === 'done') {
+            hideLoader();
+        }
+    };
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.filter(line => line.trim()).forEach(line => handleEvent(JSON.parse(line)));
+    }
+    if (buffer.trim()) handleEvent(JSON.parse(buffer));
+    hideLoader();
+}
+
 async function uploadImage(file) {
     showLoader();
     statusBar.textContent = "Uploading & Analyzing...";
@@ -416,6 +456,13 @@ async function uploadImage(file) {
         if (data.error) {
             addMessage("Error: " + data.error, 'bot');
             speak("I couldn't read that image.");
+        } else if (data.regions && data.regions.length > 1) {
+            // A worksheet: each line/problem is answered like a typed command
+            addMessage(`[Image]: ${data.regions.length} problems`, 'user');
+            data.regions.forEach((region, i) => {
+                addMessage(`[${i + 1}] ${region.text}`, 'user');
+                handleResponse(region, true);
+            });
         } else {
             addMessage("[Image]: " + data.text, 'user');
             if (data.result) {
@@ -433,8 +480,227 @@ async function uploadImage(file) {
     }
 }
 
+// ===== Client-Side Plot Rendering =====
+// With graph_format 'data' the server sends sampled geometry (base64 packed
+// little-endian arrays) instead of a PNG, and the plot is drawn here.
+const ARRAY_TYPES = { float32: Float32Array, uint16: Uint16Array, uint32: Uint32Array };
+const PLASMA = [[13, 8, 135], [126, 3, 168], [204, 71, 120], [248, 149, 64], [240, 249, 33]];
+const VIRIDIS = [[68, 1, 84], [59, 82, 139], [33, 145, 140], [94, 201, 98], [253, 231, 37]];
+
+function decodeArray(b64, type = 'float32') {
+    const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+    return new ARRAY_TYPES[type](bytes.buffer);
+}
+
+function colormap(stops, t, shade = 1) {
+    t = Math.min(Math.max(t, 0), 1) * (stops.length - 1);
+    const i = Math.min(Math.floor(t), stops.length - 2), f = t - i;
+    const c = stops[i].map((v, k) => Math.round((v + (stops[i + 1][k] - v) * f) * shade));
+    return `rgb(${c[0]}, ${c[1]}, ${c[2]})`;
+}
+
+function niceStep(span) {
+    const raw = span / 8;
+    const mag = Math.pow(10, Math.floor(Math.log10(raw)));
+    const norm = raw / mag;
+    return (norm < 1.5 ? 1 : norm < 3.5 ? 2 : norm < 7.5 ? 5 : 10) * mag;
+}
+
+function createPlotCanvas(plot) {
+    const canvas = document.createElement('canvas');
+    canvas.width = 700;
+    canvas.height = 500;
+    canvas.className = 'plot-canvas';
+    if (plot.kind === '3d') draw3D(canvas, plot);
+    else draw2D(canvas, plot);
+    return canvas;
+}
+
+function drawTitle(ctx, plot, width) {
+    ctx.fillStyle = '#0f172a';
+    ctx.font = 'bold 17px sans-serif';
+    ctx.textAlign = 'center';
+    plot.title.split('\n').forEach((line, i) => ctx.fillText(line, width / 2, 28 + i * 20));
+}
+
+function draw2D(canvas, plot) {
+    const ctx = canvas.getContext('2d');
+    const W = canvas.width, H = canvas.height;
+    const pad = { left: 45, right: 20, top: 55, bottom: 30 };
+    const [x0, x1, y0, y1] = plot.bounds;
+    const sx = x => pad.left + (x - x0) / (x1 - x0) * (W - pad.left - pad.right);
+    const sy = y => H - pad.bottom - (y - y0) / (y1 - y0) * (H - pad.top - pad.bottom);
+
+    ctx.fillStyle = '#ffffff';
+    ctx.fillRect(0, 0, W, H);
+
+    // Grid and tick labels
+    const originX = sx(Math.min(Math.max(0, x0), x1)), originY = sy(Math.min(Math.max(0, y0), y1));
+    ctx.font = '11px sans-serif';
+    ctx.lineWidth = 1;
+    ctx.setLineDash([4, 4]);
+    const xStep = niceStep(x1 - x0), yStep = niceStep(y1 - y0);
+    for (let x = Math.ceil(x0 / xStep) * xStep; x <= x1; x += xStep) {
+        ctx.strokeStyle = '#cbd5e1';
+        ctx.beginPath(); ctx.moveTo(sx(x), sy(y0)); ctx.lineTo(sx(x), sy(y1)); ctx.stroke();
+        ctx.fillStyle = '#334155';
+        ctx.textAlign = 'center';
+        ctx.fillText(+x.toFixed(6), sx(x), Math.min(originY + 14, H - 8));
+    }
+    for (let y = Math.ceil(y0 / yStep) * yStep; y <= y1; y += yStep) {
+        ctx.strokeStyle = '#cbd5e1';
+        ctx.beginPath(); ctx.moveTo(sx(x0), sy(y)); ctx.lineTo(sx(x1), sy(y)); ctx.stroke();
+        ctx.fillStyle = '#334155';
+        ctx.textAlign = 'right';
+        ctx.fillText(+y.toFixed(6), Math.max(originX - 5, 30), sy(y) + 4);
+    }
+
+    // Axes cross at zero, like the server-rendered graphs
+    ctx.setLineDash([]);
+    ctx.strokeStyle = '#1e293b';
+    ctx.beginPath();
+    ctx.moveTo(sx(x0), originY); ctx.lineTo(sx(x1), originY);
+    ctx.moveTo(originX, sy(y0)); ctx.lineTo(originX, sy(y1));
+    ctx.stroke();
+
+    // Curves, clipped to the plot area
+    ctx.save();
+    ctx.beginPath();
+    ctx.rect(pad.left, pad.top, W - pad.left - pad.right, H - pad.top - pad.bottom);
+    ctx.clip();
+    const levels = [...new Set(plot.lines.map(line => line.level).filter(level => level != null))];
+    ctx.lineWidth = 2.5;
+    ctx.lineJoin = 'round';
+    plot.lines.forEach(line => {
+        const pts = decodeArray(line.points);
+        ctx.strokeStyle = line.level != null
+            ? colormap(PLASMA, levels.indexOf(line.level) / Math.max(1, levels.length - 1))
+            : '#3b82f6';
+        ctx.beginPath();
+        for (let i = 0; i < pts.length; i += 2) {
+            if (i === 0) ctx.moveTo(sx(pts[i]), sy(pts[i + 1]));
+            else ctx.lineTo(sx(pts[i]), sy(pts[i + 1]));
+        }
+        ctx.stroke();
+    });
+    ctx.restore();
+
+    // Intercepts
+    (plot.points || []).forEach(([px, py]) => {
+        ctx.fillStyle = '#ef4444';
+        ctx.beginPath(); ctx.arc(sx(px), sy(py), 5, 0, 2 * Math.PI); ctx.fill();
+        ctx.fillStyle = '#0f172a';
+        ctx.font = '600 11px sans-serif';
+        ctx.textAlign = 'left';
+        ctx.fillText(`(${+px.toFixed(3)}, ${+py.toFixed(3)})`, sx(px) + 8, sy(py) - 8);
+    });
+
+    drawTitle(ctx, plot, W);
+}
+
+// Triangles as flat [x, y, z] * 3 arrays, from grids (z = f(x, y)) or meshes
+function surfaceTriangles(plot) {
+    const [x0, x1, y0, y1] = plot.bounds;
+    const triangles = [];
+    plot.surfaces.forEach(surface => {
+        if (surface.grid) {
+            const z = decodeArray(surface.grid);
+            const [ny, nx] = surface.shape;
+            const px = j => x0 + (x1 - x0) * j / (nx - 1), py = i => y0 + (y1 - y0) * i / (ny - 1);
+            for (let i = 0; i < ny - 1; i++) {
+                for (let j = 0; j < nx - 1; j++) {
+                    const a = [px(j), py(i), z[i * nx + j]], b = [px(j + 1), py(i), z[i * nx + j + 1]];
+                    const c = [px(j + 1), py(i + 1), z[(i + 1) * nx + j + 1]], d = [px(j), py(i + 1), z[(i + 1) * nx + j]];
+                    [[a, b, c], [a, c, d]].forEach(t => {
+                        if (t.every(p => Number.isFinite(p[2]))) triangles.push(t);
+                    });
+                }
+            }
+        } else {
+            const v = decodeArray(surface.vertices), f = decodeArray(surface.faces, surface.index_type);
+            const vertex = k => [v[3 * k], v[3 * k + 1], v[3 * k + 2]];
+            for (let k = 0; k < f.length; k += 3) triangles.push([vertex(f[k]), vertex(f[k + 1]), vertex(f[k + 2])]);
+        }
+    });
+    return triangles;
+}
+
+function draw3D(canvas, plot) {
+    const triangles = surfaceTriangles(plot);
+    // Fit the data into a unit cube, like matplotlib's autoscaling
+    const lo = [Infinity, Infinity, Infinity], hi = [-Infinity, -Infinity, -Infinity];
+    triangles.forEach(t => t.forEach(p => p.forEach((c, k) => { lo[k] = Math.min(lo[k], c); hi[k] = Math.max(hi[k], c); })));
+    const unit = p => p.map((c, k) => hi[k] > lo[k] ? (c - lo[k]) / (hi[k] - lo[k]) - 0.5 : 0);
+    const cube = triangles.map(t => t.map(unit));
+    const heights = triangles.map(t => ((t[0][2] + t[1][2] + t[2][2]) / 3 - lo[2]) / ((hi[2] - lo[2]) || 1));
+    const stops = plot.surfaces.some(s => s.grid) ? VIRIDIS : PLASMA;
+
+    let azim = -60 * Math.PI / 180, elev = 30 * Math.PI / 180, pending = false;
+    const render = () => {
+        pending = false;
+        const ctx = canvas.getContext('2d');
+        const W = canvas.width, H = canvas.height, scale = Math.min(W, H) * 0.62;
+        const ca = Math.cos(azim), sa = Math.sin(azim), ce = Math.cos(elev), se = Math.sin(elev);
+        // Screen position and depth (larger is nearer) of a point
+        const view = ([x, y, z]) => {
+            const xr = x * ca - y * sa, yr = x * sa + y * ca;
+            return [W / 2 + xr * scale, H / 2 + 20 - (z * ce + yr * se) * scale, z * se - yr * ce];
+        };
+        const light = [0.3, -0.5, 0.8];
+        const faces = cube.map((t, k) => {
+            const p = t.map(view);
+            const u = t[1].map((c, i) => c - t[0][i]), w = t[2].map((c, i) => c - t[0][i]);
+            const n = [u[1] * w[2] - u[2] * w[1], u[2] * w[0] - u[0] * w[2], u[0] * w[1] - u[1] * w[0]];
+            const len = Math.hypot(...n) || 1;
+            const shade = 0.55 + 0.45 * Math.abs((n[0] * light[0] + n[1] * light[1] + n[2] * light[2]) / len);
+            return { p, depth: (p[0][2] + p[1][2] + p[2][2]) / 3, color: colormap(stops, heights[k], shade) };
+        });
+        faces.sort((a, b) => a.depth - b.depth);
+
+        ctx.fillStyle = '#ffffff';
+        ctx.fillRect(0, 0, W, H);
+        ctx.lineWidth = 0.6;
+        faces.forEach(({ p, color }) => {
+            ctx.fillStyle = color;
+            ctx.strokeStyle = color;
+            ctx.beginPath();
+            ctx.moveTo(p[0][0], p[0][1]); ctx.lineTo(p[1][0], p[1][1]); ctx.lineTo(p[2][0], p[2][1]);
+            ctx.closePath();
+            ctx.fill();
+            ctx.stroke();
+        });
+
+        // Axis directions
+        ctx.font = '600 12px sans-serif';
+        ctx.textAlign = 'center';
+        [['x', [0.6, -0.5, -0.5]], ['y', [-0.5, 0.6, -0.5]], ['z', [-0.5, -0.5, 0.6]]].forEach(([name, tip]) => {
+            const a = view([-0.5, -0.5, -0.5]), b = view(tip);
+            ctx.strokeStyle = '#64748b';
+            ctx.beginPath(); ctx.moveTo(a[0], a[1]); ctx.lineTo(b[0], b[1]); ctx.stroke();
+            ctx.fillStyle = '#334155';
+            ctx.fillText(`${name}-axis`, b[0], b[1] - 4);
+        });
+        drawTitle(ctx, plot, W);
+    };
+    render();
+
+    // Drag to rotate
+    let drag = null;
+    canvas.style.cursor = 'grab';
+    canvas.style.touchAction = 'none';
+    canvas.addEventListener('pointerdown', e => { drag = [e.clientX, e.clientY]; canvas.setPointerCapture(e.pointerId); });
+    canvas.addEventListener('pointermove', e => {
+        if (!drag) return;
+        azim -= (e.clientX - drag[0]) * 0.01;
+        elev = Math.min(Math.max(elev + (e.clientY - drag[1]) * 0.01, -1.5), 1.5);
+        drag = [e.clientX, e.clientY];
+        if (!pending) { pending = true; requestAnimationFrame(render); }
+    });
+    canvas.addEventListener('pointerup', () => { drag = null; });
+}
+
 // ===== Response Handler =====
-function handleResponse(data) {
+function handleResponse(data, queueSpeech = false) {
     if (data.action === 'antigravity') {
         addMessage("🚀 Antigravity Activated!", 'bot');
         speak(data.speech);
@@ -442,9 +708,15 @@ function handleResponse(data) {
         return;
     }
 
-    if (data.graph) {
-        const img = document.createElement('img');
-        img.src = "data:image/png;base64," + data.graph;
+    if (data.graph || data.plot) {
+        // Geometry is drawn on a canvas; older responses carry a PNG
+        let img;
+        if (data.plot) {
+            img = createPlotCanvas(data.plot);
+        } else {
+            img = document.createElement('img');
+            img.src = "data:image/png;base64," + data.graph;
+        }
         
         // If in graphing mode or action is PLOT, update the main graph panel
         if (activeTab === 'graph-pane' || data.action?.includes('PLOT')) {
@@ -454,7 +726,7 @@ function handleResponse(data) {
             const dlBtn = document.createElement('button');
             dlBtn.className = 'graph-download-btn';
             dlBtn.innerHTML = '<i class="fas fa-download"></i> Download Graph';
-            dlBtn.onclick = () => { const a = document.createElement('a'); a.href = img.src; a.download = 'graph.png'; a.click(); };
+            dlBtn.onclick = () => { const a = document.createElement('a'); a.href = data.plot ? img.toDataURL('image/png') : img.src; a.download = 'graph.png'; a.click(); };
             activeGraphContainer.appendChild(dlBtn);
             
             // Auto-switch to graphing tab if we were in chat
@@ -476,11 +748,11 @@ function handleResponse(data) {
 
     if (data.result) {
         addMessage(data.result, 'bot');
-        speak(data.speech);
+        speak(data.speech, queueSpeech);
     } else {
         const fallback = data.speech || "I didn't understand that.";
         addMessage(fallback, 'bot');
-        speak(fallback);
+        speak(fallback, queueSpeech);
     }
     statusBar.textContent = "Ready";
 }
@@ -31,6 +31,8 @@ def test_math_engine():
         ("convert 5 km to miles", "5.0 km = 3.1069 miles"),
         ("convert 100 celsius to fahrenheit", "100.0 celsius = 212 fahrenheit"),
         ("convert 1 kg to lbs", "1.0 kg = 2.2046 lbs"),
+        ("convert 5 km to feet", "5.0 km = 16404.1995 feet"),
+        ("convert 60 miles per hour to m/s", "60.0 miles per hour = 26.8224 m/s"),
     ]
 
     print("\n--- Basic Math Tests ---\n")
@@ -65,6 +67,64 @@ def test_math_engine():
             failed += 1
             print(f"      Expected: {expected_action}, '{expected_expr}'")
 
+    print(f"\n--- Intent Cache Tests ---\n")
+    before = engine.cache_stats()['intent']['hits']
+    first = engine.parse_intent("calculate 5 plus 5")
+    hits = engine.cache_stats()['intent']['hits'] - before
+    status = "✓" if hits == 1 and first is engine.parse_intent("calculate 5 plus 5") else "✗"
+    print(f"  {status} repeated parse_intent served from cache ({hits} hit)")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+    try:
+        first['expression'] = 'tampered'
+        status = "✗"
+    except TypeError:
+        status = "✓" if engine.parse_intent("calculate 5 plus 5")['expression'] == "5+5" else "✗"
+    print(f"  {status} cached intent is read-only")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    print(f"\n--- Result Cache Tests ---\n")
+    first = engine.check_calculus("integrate x cubed")
+    before = engine.cache_stats()['result']['hits']
+    second = engine.check_calculus("integrate x^3")
+    hits = engine.cache_stats()['result']['hits'] - before
+    status = "✓" if hits == 1 and first == second else "✗"
+    print(f"  {status} 'integrate x^3' reuses cached 'integrate x cubed' ({hits} hit)")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    import tempfile
+    from caching import SQLiteStore
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStore(f"{tmp}/results.db", max_rows=5, prune_every=4)
+        for i in range(20):
+            store.put(f"key{i}", i)
+        rows, newest, oldest = len(store), store.get("key19"), store.get("key0")
+    status = "✓" if rows <= 5 and newest == 19 and oldest is None else "✗"
+    print(f"  {status} on-disk store capped at 5 rows ({rows} kept, {store.pruned} pruned)")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    print(f"\n--- Worker Pool Tests ---\n")
+    from executor import SymbolicExecutor, ComputationTimeout
+    executor = SymbolicExecutor(workers=1, timeouts={'DERIVE': 30, 'INTEGRATE': 0.001})
+    pooled = MathEngine(executor=executor)
+    result = pooled.check_calculus("differentiate x cubed")
+    status = "✓" if result and result['speech'] == "Derivative is 3·x²" else "✗"
+    print(f"  {status} 'differentiate x cubed' in worker -> '{result and result['speech']}'")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+    try:
+        pooled.check_calculus("integrate x^5 * sin(x)^3 * e^x")
+        status = "✗"
+    except ComputationTimeout:
+        status = "✓" if executor.stats()['workers'] == 1 else "✗"
+    print(f"  {status} slow integral times out and its worker is replaced")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+    executor.shutdown()
+
     print(f"\n--- Calculus Tests (LaTeX) ---\n")
     calculus_tests = [
         ("differentiate x squared", "display"),
@@ -113,6 +173,158 @@ def test_math_engine():
     passed += 1 if result == "Determinant = -2" else 0
     failed += 0 if result == "Determinant = -2" else 1
 
+    print(f"\n--- Rate Limit Tests ---\n")
+    from rate_limit import MemoryRateLimiter
+    now = [1000.0]
+    limited = MathEngine(rate_limiter=MemoryRateLimiter(max_requests=3, window_seconds=60, clock=lambda: now[0]))
+    allowed = [limited.check_rate_limit("alice") for _ in range(4)]
+    other = limited.check_rate_limit("bob")
+    now[0] += 120
+    recovered = limited.check_rate_limit("alice")
+    status = "✓" if allowed == [True, True, True, False] and other and recovered else "✗"
+    print(f"  {status} per-client limit: alice {allowed}, bob {other}, alice after window {recovered}")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+    batch = [limited.check_rate_limit("carol", cost=2), limited.check_rate_limit("carol", cost=2)]
+    status = "✓" if batch == [True, False] else "✗"
+    print(f"  {status} a cost-2 request uses two of carol's 3 requests: {batch}")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    print(f"\n--- Batch Evaluation ---\n")
+    batch = ["5 plus 3", "7 plus 2", "2 to the power of 10", "10 divided by 3", "8 divided by 0", "hello",
+             "exp(100)*2.25"]
+    expected = [engine.evaluate(text) for text in batch]
+    result = engine.evaluate_batch(batch)
+    status = "✓" if result == expected else "✗"
+    print(f"  {status} evaluate_batch matches evaluate: {result}")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    print(f"\n--- Fast Arithmetic ---\n")
+    fast_cases = ["5+5", "10/3", "2**10", "0.1+0.2", "sqrt(16)+1/3", "sin(0.5)*3", "2**0.5*2**0.5"]
+    fast = [engine._fast_evaluate(text) for text in fast_cases]
+    slow = [engine._evaluate_expr(engine._parse_safe(text)) for text in fast_cases]
+    zeros = [engine.evaluate(text) for text in ("sqrt(sin(pi))*13.25", "sin(pi)*1e8")]
+    status = ("✓" if fast[:-1] == slow[:-1] and fast[-1] is None and engine._fast_evaluate("2x+1") is None
+              and zeros == ["0", "0"] else "✗")
+    print(f"  {status} fast path matches SymPy: {fast}, exact zeros {zeros}")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    print(f"\n--- Adaptive Sampling ---\n")
+    import numpy as np
+    from sampling import adaptive_sample
+    smooth_x, _, _ = adaptive_sample(lambda v: v ** 2, -12, 12)
+    tan_x, tan_y, tan_lim = adaptive_sample(np.tan, -12, 12)
+    status = "✓" if len(smooth_x) < 400 and np.isnan(tan_y).sum() >= 7 and tan_lim else "✗"
+    print(f"  {status} x² in {len(smooth_x)} points, tan x broken at {np.isnan(tan_y).sum()} poles, ylim {tan_lim}")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    intercepts = engine.get_intercepts("sin(x)-x/3")
+    periodic = engine.get_intercepts("sin(x)")
+    status = ("✓" if sorted(round(ix, 4) for ix, _ in intercepts) == [-2.2789, 0.0, 2.2789]
+              and sorted(round(ix, 4) for ix, _ in periodic) == [-3.1416, 0.0, 3.1416] else "✗")
+    print(f"  {status} sin(x)=x/3 crosses the x-axis at {[ix for ix, _ in intercepts]}, "
+          f"sin(x) nearest the origin at {[ix for ix, _ in periodic]}")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    from sampling import trace_implicit
+    circle, evaluations = trace_implicit(lambda u, v: u ** 2 + v ** 2 - 25, (-8, 8), (-8, 8))
+    radius = np.hypot(circle[0][:, 0], circle[0][:, 1]) if circle else np.array([0.0])
+    status = "✓" if len(circle) == 1 and np.allclose(radius, 5, atol=1e-2) and evaluations < 400 * 400 / 10 else "✗"
+    print(f"  {status} x²+y²=25 traced as {len(circle)} loop from {evaluations} evaluations")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    from sampling import isosurface
+    vertices, triangles, _ = isosurface(lambda u, v, w: u ** 2 + v ** 2 + w ** 2 - 9, (-5, 5), (-5, 5), (-5, 5))
+    radius = np.linalg.norm(vertices, axis=1)
+    status = "✓" if len(triangles) and np.allclose(radius, 3, atol=0.05) else "✗"
+    print(f"  {status} x²+y²+z²=9 meshed as {len(triangles)} triangles")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    print(f"\n--- Figure Pool ---\n")
+    from figures import FigurePool
+    pool = FigurePool()
+    fig, ax = pool.acquire()
+    ax.plot([0, 1], [0, 1])
+    ax.set_title('line')
+    pool.release(ax)
+    again, ax_again = pool.acquire()
+    status = "✓" if again is fig and not ax_again.lines and not ax_again.get_title() else "✗"
+    print(f"  {status} released figure reused clean: {pool.stats()}")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+    import numpy as np
+    X, Y = np.meshgrid(np.linspace(-5, 5, 40), np.linspace(-5, 5, 40))
+    drawn = []
+    for _ in range(2):
+        fig, ax = pool.acquire()
+        ax.clabel(ax.contour(X, Y, X**2 + Y**2, levels=[4, 9, 16]))
+        ax.set_title('levels')
+        pool.release(ax)
+        drawn.append(not ax.collections and not ax.texts and not ax.get_title())
+    status = "✓" if drawn == [True, True] else "✗"
+    print(f"  {status} labelled contour plot released and redrawn on the same figure: {drawn}")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    print(f"\n--- OCR Cache ---\n")
+    import io
+    from PIL import Image, ImageDraw, ImageFont
+    from caching import SimilarityCache
+    from calculator_logic import ImageHandler
+    from ocr import hash_distance, perceptual_hash
+
+    def worksheet(text, fmt, quality=90):
+        img = Image.new('RGB', (800, 300), (245, 243, 238))
+        ImageDraw.Draw(img).text((100, 100), text, fill=(30, 30, 40), font=ImageFont.load_default(size=36))
+        data = io.BytesIO()
+        img.save(data, fmt, quality=quality)
+        return perceptual_hash(ImageHandler().load(data))
+
+    ocr_cache = SimilarityCache(max_distance=0.5, distance=hash_distance)
+    ocr_cache.put('original', ('2 + 3', '5'), worksheet('2 + 3', 'PNG'))
+    recompressed = ocr_cache.find(worksheet('2 + 3', 'JPEG', quality=60))
+    edited = ocr_cache.find(worksheet('2 + 8', 'PNG'))
+    status = "✓" if recompressed == ('2 + 3', '5') and edited is None else "✗"
+    print(f"  {status} re-encoded copy hits ({recompressed}), edited sheet misses ({edited})")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    import calculator_logic
+    import units
+    from ocr import MATH_WHITELIST
+    vocabulary = (list(calculator_logic.REPLACEMENTS) + list(calculator_logic.CONSTRUCTS)
+                  + calculator_logic.INTENT_KEYWORDS + list(units.ALIASES) + list(units.UNITS))
+    missing = sorted(set(''.join(vocabulary)) - set(MATH_WHITELIST) - {' '})
+    status = "✓" if not missing else "✗"
+    print(f"  {status} OCR whitelist covers every parser keyword (missing {missing})")
+    passed += 1 if status == "✓" else 0
+    failed += 0 if status == "✓" else 1
+
+    print(f"\n--- Offline Translation ---\n")
+    from translation import PhraseTable, Translator
+    translator = Translator([PhraseTable()])
+    for spoken, lang, expected in [
+        ("पांच जमा तीन", 'hi-IN', "8"),
+        ("सोळाचे वर्गमूळ", 'mr-IN', "4"),
+        ("raíz cuadrada de dieciséis", 'es-ES', "4"),
+        ("cien por dos", 'es-ES', "200"),
+        ("cinco y tres", 'es-ES', "8"),
+        ("treinta y cinco más uno", 'es-ES', "36"),
+    ]:
+        english = translator.translate(spoken, lang)
+        result = engine.evaluate(engine.parse_intent(english)['expression'])
+        status = "✓" if result == expected else "✗"
+        print(f"  {status} {spoken} -> '{english}' = {result}")
+        passed += 1 if status == "✓" else 0
+        failed += 0 if status == "✓" else 1
+
     print(f"\n--- LaTeX Output ---\n")
     from sympy import symbols
     x = symbols('x')
@@ -0,0 +1,330 @@
+import abc
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+from caching import ResultCache
+from lazy import timed_import
+from units import parse_unit
+
+
+# ========== PHRASE TABLES ==========
+# Spoken numbers per language (the voice languages offered in static/script.js).
+# Multipliers (100 and up) scale what precedes them: 'एक सौ' = 100, 'dos mil' = 2000
+NUMBERS = {
+    'hi': {
+        'शून्य': 0, 'एक': 1, 'दो': 2, 'तीन': 3, 'चार': 4, 'पांच': 5, 'पाँच': 5, 'छह': 6, 'छः': 6,
+        'सात': 7, 'आठ': 8, 'नौ': 9, 'दस': 10, 'ग्यारह': 11, 'बारह': 12, 'तेरह': 13, 'चौदह': 14,
+        'पंद्रह': 15, 'पन्द्रह': 15, 'सोलह': 16, 'सत्रह': 17, 'अठारह': 18, 'उन्नीस': 19, 'बीस': 20,
+        'पच्चीस': 25, 'तीस': 30, 'चालीस': 40, 'पचास': 50, 'साठ': 60, 'सत्तर': 70, 'अस्सी': 80, 'नब्बे': 90,
+        'सौ': 100, 'हजार': 1000, 'हज़ार': 1000, 'लाख': 100000, 'करोड़': 10000000,
+    },
+    'mr': {
+        'शून्य': 0, 'एक': 1, 'दोन': 2, 'तीन': 3, 'चार': 4, 'पाच': 5, 'सहा': 6, 'सात': 7, 'आठ': 8,
+        'नऊ': 9, 'दहा': 10, 'अकरा': 11, 'बारा': 12, 'तेरा': 13, 'चौदा': 14, 'पंधरा': 15, 'सोळा': 16,
+        'सतरा': 17, 'अठरा': 18, 'एकोणीस': 19, 'वीस': 20, 'पंचवीस': 25, 'तीस': 30, 'चाळीस': 40,
+        'पन्नास': 50, 'साठ': 60, 'सत्तर': 70, 'ऐंशी': 80, 'नव्वद': 90,
+        'शंभर': 100, 'हजार': 1000, 'लाख': 100000, 'कोटी': 10000000,
+    },
+    'es': {
+        'cero': 0, 'uno': 1, 'una': 1, 'un': 1, 'dos': 2, 'tres': 3, 'cuatro': 4, 'cinco': 5,
+        'seis': 6, 'siete': 7, 'ocho': 8, 'nueve': 9, 'diez': 10, 'once': 11, 'doce': 12,
+        'trece': 13, 'catorce': 14, 'quince': 15, 'dieciseis': 16, 'diecisiete': 17,
+        'dieciocho': 18, 'diecinueve': 19, 'veinte': 20, 'veintiuno': 21, 'veintidos': 22,
+        'veintitres': 23, 'veinticuatro': 24, 'veinticinco': 25, 'veintiseis': 26,
+        'veintisiete': 27, 'veintiocho': 28, 'veintinueve': 29, 'treinta': 30, 'cuarenta': 40,
+        'cincuenta': 50, 'sesenta': 60, 'setenta': 70, 'ochenta': 80, 'noventa': 90,
+        'cien': 100, 'ciento': 100, 'doscientos': 200, 'trescientos': 300, 'cuatrocientos': 400,
+        'quinientos': 500, 'seiscientos': 600, 'setecientos': 700, 'ochocientos': 800,
+        'novecientos': 900, 'mil': 1000, 'millon': 1000000, 'millones': 1000000,
+    },
+}
+
+# Words and phrases -> the English that clean_voice_text understands ('' drops
+# the word). Longest phrase wins; Spanish is matched without accents
+PHRASES = {
+    'hi': {
+        'जमा': 'plus', 'धन': 'plus', 'प्लस': 'plus', 'और': 'and',
+        'घटा': 'minus', 'ऋण': 'minus', 'माइनस': 'minus',
+        'गुना': 'times', 'गुणा': 'times',
+        'भाग': 'divided by', 'विभाजित': 'divided by',
+        'बराबर': 'equals', 'घात': 'power',
+        'वर्ग': 'squared', 'घन': 'cubed', 'वर्गमूल': 'square root',
+        'साइन': 'sine', 'कोसाइन': 'cosine', 'टैन': 'tangent', 'लॉग': 'log',
+        'एक्स': 'x', 'वाई': 'y', 'ज़ेड': 'z',
+        'ग्राफ': 'plot', 'ग्राफ़': 'plot', 'आलेख': 'plot', 'हल': 'solve',
+        'अवकलन': 'differentiate', 'समाकलन': 'integrate',
+        'बदलो': '', 'बदलें': '', 'में': 'in', 'को': '', 'का': '', 'की': '', 'के': '', 'से': '',
+        'बनाओ': '', 'बनाएं': '', 'करो': '', 'करें': '', 'क्या': '', 'है': '', 'कितना': '',
+        'फिर': 'then', 'और फिर': 'then', 'भी': 'also',
+        'सेल्सियस': 'celsius', 'फारेनहाइट': 'fahrenheit', 'फ़ारेनहाइट': 'fahrenheit', 'केल्विन': 'kelvin',
+        'मीटर': 'meters', 'किलोमीटर': 'kilometers', 'सेंटीमीटर': 'centimeters', 'मील': 'miles',
+        'फुट': 'feet', 'इंच': 'inches', 'किलोग्राम': 'kilograms', 'किलो': 'kilograms', 'ग्राम': 'grams',
+        'लीटर': 'liters', 'घंटे': 'hours', 'मिनट': 'minutes', 'सेकंड': 'seconds',
+    },
+    'mr': {
+        'अधिक': 'plus', 'बेरीज': 'plus', 'आणि': 'and',
+        'वजा': 'minus', 'उणे': 'minus',
+        'गुणिले': 'times', 'गुणले': 'times', 'गुणाकार': 'times',
+        'भागिले': 'divided by', 'भागले': 'divided by',
+        'बरोबर': 'equals', 'घात': 'power',
+        'वर्ग': 'squared', 'घन': 'cubed', 'वर्गमूळ': 'square root',
+        'साइन': 'sine', 'कोसाइन': 'cosine', 'टॅन': 'tangent', 'लॉग': 'log',
+        'एक्स': 'x', 'वाय': 'y', 'झेड': 'z',
+        'आलेख': 'plot', 'ग्राफ': 'plot', 'सोडवा': 'solve',
+        'विकलन': 'differentiate', 'संकलन': 'integrate',
+        'बदला': '', 'मध्ये': 'in', 'काढा': '', 'करा': '', 'किती': '', 'आहे': '',
+        'मग': 'then', 'नंतर': 'then', 'सुद्धा': 'also',
+        'सेल्सिअस': 'celsius', 'सेल्सियस': 'celsius', 'फॅरेनहाइट': 'fahrenheit', 'फारेनहाइट': 'fahrenheit',
+        'केल्विन': 'kelvin', 'मीटर': 'meters', 'किलोमीटर': 'kilometers', 'सेंटीमीटर': 'centimeters',
+        'मैल': 'miles', 'फूट': 'feet', 'इंच': 'inches', 'किलोग्रॅम': 'kilograms', 'किलो': 'kilograms',
+        'ग्रॅम': 'grams', 'लिटर': 'liters', 'तास': 'hours', 'मिनिटे': 'minutes', 'सेकंद': 'seconds',
+    },
+    'es': {
+        'mas': 'plus', 'menos': 'minus',
+        'por': 'times', 'multiplicado por': 'times', 'veces': 'times',
+        'dividido': 'divided by', 'dividido por': 'divided by', 'dividido entre': 'divided by',
+        'entre': 'divided by', 'sobre': 'over',
+        'raiz cuadrada de': 'square root of', 'raiz de': 'square root of',
+        'al cuadrado': 'squared', 'al cubo': 'cubed', 'elevado a': 'power',
+        'igual a': 'equals', 'es igual a': 'equals', 'igual': 'equals',
+        'seno': 'sine', 'coseno': 'cosine', 'tangente': 'tangent', 'logaritmo': 'log',
+        'calcula': 'calculate', 'calcular': 'calculate',
+        'grafica': 'plot', 'graficar': 'plot', 'dibuja': 'plot', 'traza': 'plot',
+        'resuelve': 'solve', 'resolver': 'solve',
+        'deriva': 'differentiate', 'derivar': 'differentiate', 'derivada de': 'derivative of',
+        'integra': 'integrate', 'integrar': 'integrate', 'integral de': 'integral of',
+        'convertir': 'convert', 'convierte': 'convert', 'a': 'to', 'en': 'to', 'de': 'of',
+        'luego': 'then', 'despues': 'then', 'entonces': 'then', 'tambien': 'also',
+        'cuanto es': '', 'cuanto': '', 'es': '', 'el': '', 'la': '', 'los': '', 'las': '',
+        'grados': '', 'metros': 'meters', 'kilometros': 'kilometers', 'centimetros': 'centimeters',
+        'millas': 'miles', 'pies': 'feet', 'pulgadas': 'inches', 'kilogramos': 'kilograms',
+        'kilos': 'kilograms', 'gramos': 'grams', 'libras': 'pounds', 'litros': 'liters',
+        'horas': 'hours', 'minutos': 'minutes', 'segundos': 'seconds',
+    },
+}
+
+# 'and' that also joins tens and units inside a number ('treinta y cinco' = 35).
+# Between other numbers it is 'and' ('cinco y tres' = 5 + 3); anywhere else the
+# word is left alone (Spanish 'y' is also the variable y)
+CONJUNCTIONS = {'es': 'y'}
+
+# Case endings that attach to a number or word ('सोळाचे' = "of sixteen")
+SUFFIXES = {
+    'mr': ('च्या', 'चे', 'ची', 'चा', 'ला'),
+}
+
+# Verb-final word order -> English order, applied to each "then"/"also" part
+_REORDER = [
+    (re.compile(r'(\S+) square root'), r'square root of \1'),   # 'सोलह का वर्गमूल'
+    (re.compile(r'^(.+) (\S+) in$'), r'\1 to \2'),              # '100 सेल्सिअस फॅरेनहाइट मध्ये'
+    (re.compile(r'^(.+?) (plot|solve|differentiate|integrate)$'), r'\2 \1'),
+]
+REORDER = {'hi': _REORDER, 'mr': _REORDER, 'es': []}
+
+# English that may appear as-is in a non-English command (mixed speech, symbols)
+_PASSTHROUGH_RE = re.compile(r'(?:[\d.]+|[-+*/^=(),]|(?<![a-z])[a-z](?![a-z]))+')
+_ENGLISH = {'sin', 'cos', 'tan', 'log', 'ln', 'sqrt', 'exp', 'abs', 'pi', 'plot', 'graph',
+            'solve', 'convert', 'to', 'plus', 'minus', 'times', 'over', 'squared', 'cubed'}
+_DIGITS = str.maketrans('०१२३४५६७८९', '0123456789')
+_SPLIT_RE = re.compile(r' (then|also) ')
+
+
+def _fold(text):
+    """Strip accents: 'más' and 'mas' (speech engines drop them freely) are one word."""
+    return ''.join(c for c in unicodedata.normalize('NFD', text) if not unicodedata.combining(c))
+
+
+def normalize(text, source):
+    """Canonical form of an utterance: the cache key and the phrase-table lookup text."""
+    text = unicodedata.normalize('NFC', text).lower().translate(_DIGITS)
+    if source == 'es':
+        text = _fold(text)
+    text = re.sub(r'[¿?¡!।]', ' ', text)
+    return ' '.join(text.split())
+
+
+def _combine(numbers):
+    """Spoken number words -> numbers: [1, 100] -> [100], [100, 20] -> [120], [5, 3] -> [5, 3]."""
+    result, total, current = [], 0, None
+    for n in numbers:
+        if n >= 1000:
+            total, current = total + (current or 1) * n, 0
+        elif n == 100:
+            current = (current or 1) * 100
+        elif current == 0 or current and current % 10 ** len(str(n)) == 0:
+            current += n
+        else:
+            if current is not None:
+                result.append(total + current)
+            total, current = 0, n
+    if current is not None:
+        result.append(total + current)
+    return result
+
+
+# ========== BACKENDS ==========
+class TranslationBackend(abc.ABC):
+    """Turns a command in `source` (an ISO 639-1 code) into English.
+
+    translate() returns the English text, or None when this backend can't
+    (unknown words, unsupported language), so the next backend is tried.
+    Raising counts as an error and also moves on. Results are cached only
+    if cache_results is set; local backends are cheaper to rerun than to store.
+    """
+
+    name = 'backend'
+    cache_results = True
+
+    @abc.abstractmethod
+    def translate(self, text, source):
+        """English for text, or None."""
+
+
+class PhraseTable(TranslationBackend):
+    """Offline word-by-word translation of the common math phrasing in NUMBERS and PHRASES.
+
+    Only answers when every word is known, so unusual sentences still go to
+    a full translator instead of being half-translated.
+    """
+
+    name = 'offline'
+    cache_results = False
+
+    def __init__(self, numbers=NUMBERS, phrases=PHRASES, suffixes=SUFFIXES, reorder=REORDER,
+                 conjunctions=CONJUNCTIONS):
+        self.numbers = numbers
+        self.phrases = phrases
+        self.suffixes = suffixes
+        self.conjunctions = conjunctions
+        self.reorder = reorder
+        self.longest = {lang: max(len(p.split()) for p in table) for lang, table in phrases.items()}
+
+    def supports(self, source):
+        return source in self.phrases
+
+    def _word(self, word, source):
+        """Number or English for one word, trying it without case endings; None if unknown."""
+        for stem in [word] + [word[:-len(s)] for s in self.suffixes.get(source, ()) if word.endswith(s)]:
+            if stem in self.numbers[source]:
+                return self.numbers[source][stem]
+            if stem in self.phrases[source]:
+                return self.phrases[source][stem]
+        if _PASSTHROUGH_RE.fullmatch(word) or word in _ENGLISH or parse_unit(word) is not None:
+            return word
+        return None
+
+    def translate(self, text, source):
+        if not self.supports(source):
+            return None
+        words = normalize(text, source).split()
+        parts, i = [], 0
+        while i < len(words):
+            for size in range(min(self.longest[source], len(words) - i), 1, -1):
+                phrase = ' '.join(words[i:i + size])
+                if phrase in self.phrases[source]:
+                    parts.append(self.phrases[source][phrase])
+                    i += size
+                    break
+            else:
+                part = self._word(words[i], source)
+                if part is None:
+                    return None
+                parts.append(part)
+                i += 1
+
+        # Runs of number words become one number each
+        english, run = [], []
+        conjunction = self.conjunctions.get(source)
+        for j, part in enumerate(parts):
+            if isinstance(part, int):
+                run.append(part)
+                continue
+            following = parts[j + 1] if j + 1 < len(parts) else None
+            if part == conjunction and run and isinstance(following, int):
+                if run[-1] in (20, 30, 40, 50, 60, 70, 80, 90) and 1 <= following <= 9:
+                    continue  # 'treinta y cinco'
+                part = 'and'
+            english.extend(str(n) for n in _combine(run))
+            run = []
+            if part:
+                english.append(part)
+        english.extend(str(n) for n in _combine(run))
+
+        segments = _SPLIT_RE.split(' '.join(english))
+        for k in range(0, len(segments), 2):
+            for pattern, replacement in self.reorder.get(source, ()):
+                segments[k] = pattern.sub(replacement, segments[k])
+        return ' '.join(segments) or None
+
+
+class GoogleBackend(TranslationBackend):
+    """deep_translator's GoogleTranslator, imported on first use, one client per thread."""
+
+    name = 'google'
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def translate(self, text, source):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = timed_import('deep_translator', 'translation').GoogleTranslator(
+                source='auto', target='en')
+        return client.translate(text) or None
+
+
+# ========== TRANSLATOR ==========
+class Translator:
+    """Non-English commands -> English through a chain of backends, with a cache in front.
+
+    Backends are tried in order; the first answer wins. Answers from
+    backends with cache_results (the network ones) are kept in an LRU,
+    optionally persisted to SQLite, keyed on language and normalized text,
+    so a repeated utterance is translated once per deployment.
+    """
+
+    def __init__(self, backends, cache_size=512, cache_path=None):
+        self.backends = list(backends)
+        self.cache = ResultCache(maxsize=cache_size, path=cache_path)
+        self._lock = threading.Lock()
+        self.answered = Counter()
+        self.errors = Counter()
+        self.untranslated = 0
+
+    def translate(self, text, lang):
+        """English for text spoken in lang ('hi-IN', 'es'); the original text if nothing can translate it."""
+        source = lang.split('-')[0].lower()
+        if source == 'en' or not text.strip():
+            return text
+        key = f"{source}:{normalize(text, source)}"
+        english = self.cache.get(key)
+        if english is not None:
+            return english
+        for backend in self.backends:
+            try:
+                english = backend.translate(text, source)
+            except Exception:
+                with self._lock:
+                    self.errors[backend.name] += 1
+                continue
+            if english:
+                with self._lock:
+                    self.answered[backend.name] += 1
+                if backend.cache_results:
+                    self.cache.put(key, english)
+                return english
+        with self._lock:
+            self.untranslated += 1
+        return text
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backends': [backend.name for backend in self.backends],
+                'answered': dict(self.answered),
+                'errors': dict(self.errors),
+                'untranslated': self.untranslated,
+                'cache': self.cache.stats(),
+            }
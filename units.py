@@ -0,0 +1,265 @@
+import re
+from collections import namedtuple
+from fractions import Fraction
+
+from caching import LRUCache
+
+
+# A unit is its size in base units (m, kg, s, K, byte) and the exponent of each
+# base dimension; value_in_base = value * factor + offset (offset: temperatures)
+Unit = namedtuple('Unit', 'factor dimension offset', defaults=(0.0,))
+
+DIMENSIONS = ('length', 'mass', 'time', 'temperature', 'data')
+
+
+def _dimension(length=0, mass=0, time=0, temperature=0, data=0):
+    return (length, mass, time, temperature, data)
+
+
+LENGTH = _dimension(length=1)
+AREA = _dimension(length=2)
+VOLUME = _dimension(length=3)
+MASS = _dimension(mass=1)
+TIME = _dimension(time=1)
+SPEED = _dimension(length=1, time=-1)
+TEMPERATURE = _dimension(temperature=1)
+DATA = _dimension(data=1)
+FORCE = _dimension(length=1, mass=1, time=-2)
+ENERGY = _dimension(length=2, mass=1, time=-2)
+POWER = _dimension(length=2, mass=1, time=-3)
+PRESSURE = _dimension(length=-1, mass=1, time=-2)
+
+# ========== UNIT TABLES ==========
+UNITS = {
+    # Length (metre)
+    'm': Unit(1.0, LENGTH),
+    'km': Unit(1000.0, LENGTH),
+    'cm': Unit(0.01, LENGTH),
+    'mm': Unit(0.001, LENGTH),
+    'mile': Unit(1609.344, LENGTH),
+    'yard': Unit(0.9144, LENGTH),
+    'ft': Unit(0.3048, LENGTH),
+    'inch': Unit(0.0254, LENGTH),
+    'nmi': Unit(1852.0, LENGTH),
+
+    # Area and volume
+    'hectare': Unit(1e4, AREA),
+    'acre': Unit(4046.8564224, AREA),
+    'l': Unit(1e-3, VOLUME),
+    'ml': Unit(1e-6, VOLUME),
+    'gallon': Unit(3.785411784e-3, VOLUME),
+
+    # Mass (kilogram)
+    'kg': Unit(1.0, MASS),
+    'g': Unit(1e-3, MASS),
+    'mg': Unit(1e-6, MASS),
+    'tonne': Unit(1000.0, MASS),
+    'lb': Unit(0.45359237, MASS),
+    'oz': Unit(0.028349523125, MASS),
+    'stone': Unit(6.35029318, MASS),
+
+    # Time (second)
+    's': Unit(1.0, TIME),
+    'ms': Unit(1e-3, TIME),
+    'min': Unit(60.0, TIME),
+    'h': Unit(3600.0, TIME),
+    'day': Unit(86400.0, TIME),
+    'week': Unit(604800.0, TIME),
+    'year': Unit(31557600.0, TIME),
+
+    # Speed (metre per second)
+    'kmph': Unit(1000 / 3600, SPEED),
+    'mph': Unit(1609.344 / 3600, SPEED),
+    'knot': Unit(1852 / 3600, SPEED),
+
+    # Temperature (kelvin)
+    'k': Unit(1.0, TEMPERATURE),
+    'c': Unit(1, TEMPERATURE, Fraction('273.15')),
+    'f': Unit(Fraction(5, 9), TEMPERATURE, Fraction('273.15') - 32 * Fraction(5, 9)),
+
+    # Data (byte, binary multiples as before)
+    'bit': Unit(1 / 8, DATA),
+    'byte': Unit(1.0, DATA),
+    'kb': Unit(1024.0, DATA),
+    'mb': Unit(1024.0 ** 2, DATA),
+    'gb': Unit(1024.0 ** 3, DATA),
+    'tb': Unit(1024.0 ** 4, DATA),
+
+    # Derived SI units
+    'n': Unit(1.0, FORCE),
+    'j': Unit(1.0, ENERGY),
+    'kj': Unit(1000.0, ENERGY),
+    'cal': Unit(4.184, ENERGY),
+    'kcal': Unit(4184.0, ENERGY),
+    'kwh': Unit(3.6e6, ENERGY),
+    'w': Unit(1.0, POWER),
+    'kw': Unit(1000.0, POWER),
+    'hp': Unit(745.69987158227022, POWER),
+    'pa': Unit(1.0, PRESSURE),
+    'kpa': Unit(1000.0, PRESSURE),
+    'bar': Unit(1e5, PRESSURE),
+    'atm': Unit(101325.0, PRESSURE),
+    'psi': Unit(6894.757293168361, PRESSURE),
+}
+
+# Spoken and written names for the units above; a trailing plural 's' is
+# also accepted for any of them (kilometers, pounds, hours)
+ALIASES = {
+    'metre': 'm', 'meter': 'm',
+    'kilometre': 'km', 'kilometer': 'km',
+    'centimetre': 'cm', 'centimeter': 'cm',
+    'millimetre': 'mm', 'millimeter': 'mm',
+    'mi': 'mile',
+    'yd': 'yard',
+    'foot': 'ft', 'feet': 'ft',
+    'in': 'inch', 'inches': 'inch',
+    'ha': 'hectare',
+    'litre': 'l', 'liter': 'l',
+    'millilitre': 'ml', 'milliliter': 'ml',
+    'gal': 'gallon',
+    'kilogram': 'kg', 'kilo': 'kg',
+    'gram': 'g',
+    'milligram': 'mg',
+    'ton': 'tonne', 't': 'tonne',
+    'lbs': 'lb', 'pound': 'lb',
+    'ounce': 'oz',
+    'sec': 's', 'second': 's',
+    'millisecond': 'ms',
+    'minute': 'min',
+    'hr': 'h', 'hour': 'h',
+    'd': 'day',
+    'wk': 'week',
+    'yr': 'year',
+    'kph': 'kmph', 'kmh': 'kmph',
+    'kn': 'knot', 'kt': 'knot',
+    'kelvin': 'k', '°k': 'k',
+    'celsius': 'c', 'centigrade': 'c', '°c': 'c',
+    'fahrenheit': 'f', '°f': 'f',
+    'bits': 'bit',
+    'b': 'byte',
+    'kilobyte': 'kb',
+    'megabyte': 'mb',
+    'gigabyte': 'gb',
+    'terabyte': 'tb',
+    'newton': 'n',
+    'joule': 'j',
+    'kilojoule': 'kj',
+    'calorie': 'cal',
+    'kilocalorie': 'kcal',
+    'watt': 'w',
+    'kilowatt': 'kw',
+    'horsepower': 'hp',
+    'pascal': 'pa',
+    'kilopascal': 'kpa',
+    'atmosphere': 'atm',
+}
+
+_POWER_WORDS = {'square': 2, 'sq': 2, 'cubic': 3, 'cu': 3}
+_TERM_RE = re.compile(r'([*/]?)((?:(?:square|sq|cubic|cu)\s+)?[a-z°µ]+)(?:\^(-?\d+))?')
+
+# Parsed unit strings, including compound ones like 'km/h' and 'm/s^2', and
+# the (scale, shift) of each (from, to) pair converted so far
+unit_cache = LRUCache(maxsize=256)
+conversion_cache = LRUCache(maxsize=256)
+
+
+def _lookup(name):
+    """The Unit for a single unit name or alias, or None."""
+    name = ALIASES.get(name, name)
+    unit = UNITS.get(name)
+    if unit is None and name.endswith('s') and len(name) > 2:
+        singular = ALIASES.get(name[:-1], name[:-1])
+        unit = UNITS.get(singular)
+    return unit
+
+
+def _normalize(text):
+    text = re.sub(r'\s+', ' ', text.lower().strip())
+    text = re.sub(r'\s+per\s+', '/', text)
+    text = text.replace('**', '^').replace('·', '*')
+    return re.sub(r'\s*([*/^])\s*', r'\1', text)
+
+
+def parse_unit(text):
+    """Unit for a name, alias or compound expression ('km/h', 'm/s^2', 'kg*m/s^2'), or None.
+
+    Each term multiplies the factor and adds to the dimension exponents, so a
+    compound unit reduces to the same base form as a named one. Offsets only
+    apply to a lone unit (degrees C/F); inside a compound they are ignored.
+    """
+    text = _normalize(text)
+    unit = unit_cache.get(text)
+    if unit is None:
+        unit = _parse_uncached(text) or False
+        unit_cache.put(text, unit)
+    return unit or None
+
+
+def _parse_uncached(text):
+    unit = _lookup(text)
+    if unit is not None:
+        return unit
+    factor, dimension, position, terms = 1.0, [0] * len(DIMENSIONS), 0, 0
+    while position < len(text):
+        match = _TERM_RE.match(text, position)
+        if match is None or match.end() == position:
+            return None
+        operator, name, exponent = match.groups()
+        if terms and not operator:
+            return None
+        power = int(exponent) if exponent else 1
+        words = name.split(' ', 1)
+        if words[0] in _POWER_WORDS and len(words) == 2:
+            power *= _POWER_WORDS[words[0]]
+            name = words[1]
+        term = _lookup(name)
+        if term is None:
+            return None
+        if operator == '/':
+            power = -power
+        factor *= term.factor ** power
+        dimension = [d + t * power for d, t in zip(dimension, term.dimension)]
+        position, terms = match.end(), terms + 1
+    if not terms:
+        return None
+    return Unit(factor, tuple(dimension))
+
+
+def converter(from_unit, to_unit):
+    """(scale, shift) with target = value * scale + shift, or None if the units don't match.
+
+    Every unit is stored relative to its base unit, so any two units of the
+    same dimension convert directly, with no table of pairs.
+    """
+    key = (from_unit, to_unit)
+    conversion = conversion_cache.get(key)
+    if conversion is None:
+        conversion = False
+        source, target = parse_unit(from_unit), parse_unit(to_unit)
+        if source is not None and target is not None and source.dimension == target.dimension:
+            # In exact arithmetic, so 0 C -> F is 32 and not 31.999999999999986
+            scale = Fraction(source.factor) / Fraction(target.factor)
+            shift = (Fraction(source.offset) - Fraction(target.offset)) / Fraction(target.factor)
+            conversion = (float(scale), float(shift))
+        conversion_cache.put(key, conversion)
+    return conversion or None
+
+
+def convert(value, from_unit, to_unit):
+    """value converted from from_unit to to_unit, or None if they are not compatible."""
+    conversion = converter(from_unit, to_unit)
+    if conversion is None:
+        return None
+    scale, shift = conversion
+    return value * scale + shift
+
+
+def convert_many(values, from_unit, to_unit):
+    """Convert a list or array of values at once; a float NumPy array, or None."""
+    import numpy as np
+
+    conversion = converter(from_unit, to_unit)
+    if conversion is None:
+        return None
+    scale, shift = conversion
+    return np.asarray(values, dtype=float) * scale + shift
@@ -12,7 +12,8 @@ import webbrowser
 from PIL import Image
 import pytesseract
 import os
-from calculator_logic import MathEngine, ImageHandler
+from calculator_logic import MathEngine, ImageHandler, cached_lambdify
+from sampling import adaptive_sample
 
 # Ensure Tesseract is in PATH or set it explicitly if needed
 # pytesseract.pytesseract.tesseract_cmd = r'/usr/bin/tesseract'
@@ -192,15 +193,16 @@ class CalculatorGUI:
             x = sympy.symbols('x')
             # Generate points
             # We need to turn the string into a lambda function or evaluate it multiple times
-            # Using sympy to lambdify is safer
+            # Using sympy to lambdify is safer (compiled once per expression)
             f = sympy.sympify(func_str)
-            f_lambdified = sympy.lambdify(x, f, modules=['numpy'])
+            f_lambdified = cached_lambdify(x, f, modules=['numpy'])
             
-            import numpy as np
-            x_vals = np.linspace(-10, 10, 400)
-            y_vals = f_lambdified(x_vals) # This handles numpy arrays efficiently
+            # Dense only where the curve bends, broken at poles
+            x_vals, y_vals, y_lim = adaptive_sample(f_lambdified, -10, 10)
             
             self.ax.plot(x_vals, y_vals, color='#00FF00', linewidth=2)
+            if y_lim:
+                self.ax.set_ylim(*y_lim)
             self.ax.grid(True, color='gray', linestyle='--', alpha=0.5)
             self.ax.set_title(f"y = {func_str}", color='white')
             